@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional
+
+from leaderboard import leaderboards, video_records
+from rollup import DailyRollup
+from kpi import (Window, compute_kpis, calculate_previous_date_range, format_value,
+                 VIDEO_METRICS, ORDER_METRICS)
+
+VIDEO_TIME_COLUMN = 'Time'
+ORDER_TIME_COLUMN = 'Paid Time'
+
+
+class SortedFrame:
+    """
+    A frame sorted once by its time column, sliced by window with binary search.
+
+    Every window lookup is two searchsorted calls plus a positional slice, so many
+    windows over the same data never rescan or re-sort it.
+    """
+
+    def __init__(self, df: pd.DataFrame, time_column: str):
+        self.time_column = time_column
+        self.df = df.sort_values(time_column, kind='stable').reset_index(drop=True)
+        self._times = self.df[time_column].to_numpy(dtype='datetime64[ns]')
+
+    def _position(self, when, side: str) -> int:
+        return int(np.searchsorted(self._times, np.datetime64(pd.Timestamp(when), 'ns'), side=side))
+
+    def slice(self, start, end) -> pd.DataFrame:
+        """Rows with start <= time <= end."""
+        return self.df.iloc[self._position(start, 'left'):self._position(end, 'right')]
+
+    def until(self, end) -> pd.DataFrame:
+        """Rows with time <= end."""
+        return self.df.iloc[:self._position(end, 'right')]
+
+
+def filter_brand(df: pd.DataFrame, column: str, brand: Optional[str]) -> pd.DataFrame:
+    """Rows whose product column mentions the brand (case-insensitive); all rows when brand is empty."""
+    if not brand:
+        return df
+    return df[df[column].astype(str).str.contains(brand, case=False, regex=False, na=False)]
+
+
+def build_report_placeholders(videos: SortedFrame, orders: SortedFrame, current: Window,
+                              previous: Optional[Window] = None,
+                              rollup: Optional[DailyRollup] = None) -> Dict[str, str]:
+    """
+    Compute the scalar placeholders of the Agenda template for one reporting window.
+
+    Without a rollup, videos and orders must cover everything up to the window end,
+    since the all-time totals are summed from them. With a rollup, the video KPIs
+    and all-time totals come from its prefix sums (resolved to whole days) and the
+    frames only need to cover the current and previous windows.
+
+    Args:
+        videos: Video rows sorted by Time
+        orders: Order rows sorted by Paid Time
+        current: (start, end) of the reporting window, inclusive
+        previous: Comparison window; defaults to calculate_previous_date_range
+        rollup: DailyRollup (or a for_brand view matching the frames' brand filter)
+
+    Returns:
+        {'{placeholder}': value} mapping
+    """
+    current = (pd.Timestamp(current[0]), pd.Timestamp(current[1]))
+    if previous is None:
+        previous = calculate_previous_date_range(current[0].to_pydatetime(), current[1].to_pydatetime())
+
+    # One slice spanning both windows, so a row on a shared boundary is counted once
+    span = (min(pd.Timestamp(previous[0]), current[0]), max(pd.Timestamp(previous[1]), current[1]))
+    orders_now = orders.slice(*current)
+    order_kpis = compute_kpis(orders.slice(*span), ORDER_TIME_COLUMN, current, previous, ORDER_METRICS)
+    product_counts = orders_now['Product Name'].value_counts()
+
+    if rollup is None:
+        video_kpis = compute_kpis(videos.slice(*span), VIDEO_TIME_COLUMN, current, previous, VIDEO_METRICS)
+        history = videos.until(current[1])
+        totals = {
+            'posts': len(history),
+            'vv': history['VV'].sum(),
+            'engagement': history['Likes'].sum() + history['Shares'].sum() + history['Comments'].sum(),
+            'orders': len(orders.until(current[1])),
+        }
+    else:
+        video_kpis = rollup.compare(current, previous)
+        totals = rollup.history_totals(current[1])
+
+    placeholders = {
+        '{start_date}': current[0].strftime('%Y-%m-%d'),
+        '{end_date}': current[1].strftime('%Y-%m-%d'),
+        '{unique_product}': format_value(totals.get('orders', 0)),
+        '{total_posts_with_vv}': format_value(totals.get('posts', 0)),
+        '{total_all_vv}': format_value(totals.get('vv', 0)),
+        '{total_all_engagement}': format_value(totals.get('engagement', 0)),
+        '{Product List}': "\n".join(f"• {product}: {count}" for product, count in product_counts.items()),
+    }
+    placeholders.update(video_kpis.to_placeholders())
+    placeholders.update(order_kpis.to_placeholders())
+    return placeholders
+
+
+def build_report_lists(videos: SortedFrame, current: Window, top_n: int = 3,
+                       rollup: Optional[DailyRollup] = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Top-N video lists for the template's repeated blocks.
+
+    List names match the template's {video.*}, {historical_video.*}, {vv_video.*},
+    {vv_historical_video.*}, {engagement_video.*} and {ctr_video.*} blocks (and the
+    legacy {video_1_creator}-style keys). Each list ranks every video in its window.
+    With a rollup, the all-time lists are merged from its per-day top lists, so
+    videos only needs to cover the current window.
+    """
+    now = leaderboards(videos.slice(*current), ('revenue', 'vv', 'engagement', 'ctr'), top_n)
+    if rollup is None:
+        history = leaderboards(videos.until(current[1]), ('revenue', 'vv'), top_n)
+    else:
+        history = {metric: video_records(rollup.top_videos(None, current[1], rank_metric, top_n))
+                   for metric, rank_metric in (('revenue', 'gmv'), ('vv', 'vv'))}
+    return {
+        'video': now['revenue'],
+        'historical_video': history['revenue'],
+        'vv_video': now['vv'],
+        'vv_historical_video': history['vv'],
+        'engagement_video': now['engagement'],
+        'ctr_video': now['ctr'],
+    }
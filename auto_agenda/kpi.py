@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional, Union, Callable
+from dateutil.relativedelta import relativedelta
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+CURRENT = 'current'
+PREVIOUS = 'previous'
+
+Window = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+def calculate_previous_date_range(start_date: Union[str, datetime],
+                                  end_date: Union[str, datetime]) -> Tuple[datetime, datetime]:
+    """
+    Return the comparison window that precedes [start_date, end_date].
+
+    Weekly windows shift back one week, 15-day windows 15 days, monthly windows
+    one calendar month, and anything else by its own length.
+    """
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, DATE_FORMAT)
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, DATE_FORMAT)
+
+    date_diff = end_date - start_date
+    if date_diff.days == 6:  # Weekly
+        return start_date - timedelta(weeks=1), end_date - timedelta(weeks=1)
+    if date_diff.days == 14:  # (15 days)
+        return start_date - timedelta(days=15), end_date - timedelta(days=15)
+    if 28 <= date_diff.days <= 31:  # Monthly
+        return start_date - relativedelta(months=1), end_date - relativedelta(months=1)
+    return start_date - date_diff, end_date - date_diff
+
+
+def format_value(value):
+    """Format numbers with a thousands separator; pass anything else through."""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return f"{value:,.0f}"
+    return value
+
+
+def format_percentage(value):
+    """Describe a percentage change in words, e.g. 'increase by 12.50%'."""
+    if value >= 0:
+        return f"increase by {value:.2f}%"
+    else:
+        return f"decrease by {abs(value):.2f}%"
+
+
+# Per-row columns derived from the raw export, computed only when a registered metric needs them
+DERIVED_COLUMNS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    'Engagement': lambda df: df['Likes'] + df['Shares'] + df['Comments'],
+    'Calculated CTR': lambda df: (df['Product Clicks'] / df['Product Impressions']).replace([np.inf, -np.inf], np.nan),
+}
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    Declarative KPI definition.
+
+    A metric either aggregates a (raw or derived) column with a pandas aggregation,
+    or, with ratio_of, divides two other metrics after aggregation.
+    """
+    name: str
+    column: Optional[str] = None
+    agg: str = 'sum'
+    ratio_of: Optional[Tuple[str, str]] = None
+    scale: float = 1.0
+    fmt: str = 'count'  # 'count', 'currency' or 'percent'
+    placeholder: Optional[str] = None
+    change_placeholder: Optional[str] = None
+
+
+VIDEO_METRICS: List[Metric] = [
+    Metric('gmv', 'Video Revenue ($)', fmt='currency',
+           placeholder='{total_gmv}', change_placeholder='{gmv_comparison}'),
+    Metric('posts', 'Video ID', agg='size',
+           placeholder='{total_posts}', change_placeholder='{percentage_change}'),
+    Metric('vv', 'VV', placeholder='{total_vv}', change_placeholder='{vv_percentage_change}'),
+    Metric('product_impressions', 'Product Impressions',
+           placeholder='{now_product_impression}', change_placeholder='{product_impression_percentage_change}'),
+    Metric('engagement', 'Engagement',
+           placeholder='{total_engagement}', change_placeholder='{engagement_percentage_change}'),
+    Metric('ctr', 'Calculated CTR', agg='mean', scale=100, fmt='percent',
+           placeholder='{average_ctr_now}', change_placeholder='{ctr_percentage_change}'),
+    Metric('engagement_rate', ratio_of=('engagement', 'vv'), scale=100, fmt='percent',
+           placeholder='{engagement_rate}'),
+]
+
+ORDER_METRICS: List[Metric] = [
+    Metric('orders', 'Product Name', agg='size', placeholder='{new_product}'),
+    Metric('unique_products', 'Product Name', agg='nunique'),
+]
+
+
+@dataclass
+class MetricValue:
+    """Current and previous window values of one metric and the percentage change between them."""
+    metric: Metric
+    current: float
+    previous: float
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        """Percentage change from previous to current, or None when there is no previous base."""
+        if pd.isna(self.previous) or self.previous == 0 or pd.isna(self.current):
+            return None
+        return (self.current - self.previous) / self.previous * 100
+
+    def formatted(self, value: Optional[float] = None) -> str:
+        """Format a value (the current one by default) according to the metric's fmt."""
+        value = self.current if value is None else value
+        if pd.isna(value):
+            return 'N/A'
+        if self.metric.fmt == 'currency':
+            return f"${format_value(value)}"
+        if self.metric.fmt == 'percent':
+            return f"{value:.2f}%"
+        return format_value(value)
+
+    def formatted_change(self) -> str:
+        change = self.change_pct
+        return format_percentage(change) if change is not None else 'N/A'
+
+
+@dataclass
+class KPIResult:
+    """All metric values for a current window and its comparison window."""
+    current_window: Window
+    previous_window: Window
+    metrics: Dict[str, MetricValue] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> MetricValue:
+        return self.metrics[name]
+
+    def to_placeholders(self) -> Dict[str, str]:
+        """Template placeholders for every metric that declares one."""
+        placeholders = {}
+        for value in self.metrics.values():
+            if value.metric.placeholder:
+                placeholders[value.metric.placeholder] = value.formatted()
+            if value.metric.change_placeholder:
+                placeholders[value.metric.change_placeholder] = value.formatted_change()
+        return placeholders
+
+
+def label_windows(times: pd.Series, current: Window, previous: Window) -> pd.Series:
+    """Label each timestamp 'current', 'previous' or NaN (outside both windows); bounds are inclusive."""
+    labels = np.select(
+        [times.between(*current), times.between(*previous)],
+        [CURRENT, PREVIOUS],
+        default=None
+    )
+    return pd.Series(labels, index=times.index, dtype=object)
+
+
+def compute_kpis(df: pd.DataFrame, time_column: str, current: Window, previous: Optional[Window] = None,
+                 metrics: List[Metric] = VIDEO_METRICS) -> KPIResult:
+    """
+    Compute every registered metric for the current and previous windows in one grouped aggregation.
+
+    Args:
+        df: Rows with a parsed datetime time_column
+        time_column: Column used to assign rows to windows
+        current: (start, end) of the reporting window, inclusive
+        previous: (start, end) of the comparison window; defaults to calculate_previous_date_range
+        metrics: Metric registry to evaluate
+
+    Returns:
+        KPIResult with one MetricValue per metric
+    """
+    current = (pd.Timestamp(current[0]), pd.Timestamp(current[1]))
+    if previous is None:
+        previous = calculate_previous_date_range(current[0].to_pydatetime(), current[1].to_pydatetime())
+    previous = (pd.Timestamp(previous[0]), pd.Timestamp(previous[1]))
+
+    aggregated = [m for m in metrics if m.ratio_of is None]
+    needed = {m.column for m in aggregated}
+    frame = df[[time_column] + [c for c in needed if c in df.columns]]
+    derived = {c: DERIVED_COLUMNS[c](df) for c in needed if c not in df.columns}
+    if derived:
+        frame = frame.assign(**derived)
+
+    window = label_windows(frame[time_column], current, previous)
+    named_aggs = {m.name: (m.column, m.agg) for m in aggregated}
+    totals = (frame.groupby(window).agg(**named_aggs)
+              .reindex([CURRENT, PREVIOUS]))
+    # Empty windows aggregate to NaN after reindexing; counts and sums of nothing are zero
+    for m in aggregated:
+        if m.agg in ('sum', 'size', 'count', 'nunique'):
+            totals[m.name] = totals[m.name].fillna(0)
+
+    result = KPIResult(current_window=current, previous_window=previous)
+    for m in metrics:
+        if m.ratio_of is None:
+            values = totals[m.name]
+        else:
+            numerator, denominator = totals[m.ratio_of[0]], totals[m.ratio_of[1]]
+            values = numerator / denominator.replace(0, np.nan)
+        values = values * m.scale
+        result.metrics[m.name] = MetricValue(m, float(values[CURRENT]), float(values[PREVIOUS]))
+    return result
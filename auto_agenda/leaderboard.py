@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Iterable, Optional
+
+from kpi import DERIVED_COLUMNS, format_value
+
+# Ranking metric -> column it ranks by; derived columns come from kpi.DERIVED_COLUMNS
+RANKING_METRICS: Dict[str, str] = {
+    'revenue': 'Video Revenue ($)',
+    'vv': 'VV',
+    'engagement': 'Engagement',
+    'ctr': 'Calculated CTR',
+}
+# Videos with fewer product impressions are left out of the CTR ranking, where one click in one view tops it
+MIN_CTR_IMPRESSIONS = 100
+
+
+def ranking_scores(df: pd.DataFrame, metric: str, min_impressions: int = MIN_CTR_IMPRESSIONS) -> np.ndarray:
+    """
+    One float per row for a ranking metric, computed as a column vector without copying the frame.
+
+    For 'ctr', rows below min_impressions get NaN and are not ranked.
+    """
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"Unknown ranking metric: {metric}")
+    column = RANKING_METRICS[metric]
+    values = df[column] if column in df.columns else DERIVED_COLUMNS[column](df)
+    values = pd.to_numeric(values, errors='coerce')
+    if metric == 'ctr':
+        values = values.where(pd.to_numeric(df['Product Impressions'], errors='coerce') >= min_impressions)
+    return values.to_numpy(dtype=float, na_value=np.nan)
+
+
+def top_n_positions(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Positions of the n largest scores, best first.
+
+    argpartition selects the candidates in linear time and only those n are
+    sorted. Rows with a NaN score are not ranked, as with nlargest; ties keep
+    their row order.
+    """
+    ranked = np.flatnonzero(~np.isnan(scores))
+    n = min(n, len(ranked))
+    if n == 0:
+        return np.empty(0, dtype=int)
+    keys = scores[ranked]
+    candidates = np.argpartition(-keys, n - 1)[:n] if n < len(keys) else np.arange(len(keys))
+    return ranked[candidates[np.lexsort((candidates, -keys[candidates]))]]
+
+
+def video_records(selected: pd.DataFrame, ctr: Optional[np.ndarray] = None) -> List[Dict[str, str]]:
+    """
+    Formatted records (creator, products, vv, revenue, engagement, CTR, link) of already-selected rows.
+
+    CTR shows the given per-row ratios as percentages when ctr is passed (the
+    value a CTR leaderboard is ranked by), and the export's CTR column otherwise.
+    """
+    if len(selected) == 0:
+        return []
+    engagement = DERIVED_COLUMNS['Engagement'](selected)
+    records = []
+    for i in range(len(selected)):
+        row = selected.iloc[i]
+        records.append({
+            'creator': row['Creator name'],
+            'products': row['Products'],
+            'vv': format_value(row['VV']),
+            'revenue': f"${format_value(row['Video Revenue ($)'])}",
+            'engagement': format_value(engagement.iloc[i]),
+            'CTR': f"{ctr[i] * 100:.2f}%" if ctr is not None else format_value(row.get('CTR', '')),
+            'link': f"www.tiktok.com/@{row['Creator name']}/video/{row['Video ID']}",
+        })
+    return records
+
+
+def leaderboards(df: pd.DataFrame, metrics: Iterable[str] = ('revenue', 'vv'), n: int = 3,
+                 min_impressions: int = MIN_CTR_IMPRESSIONS) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Top n videos of one window for each ranking metric.
+
+    Every metric ranks all rows of the window independently. Engagement, link and
+    the formatted fields are computed only for the selected rows, never the full frame.
+    The 'ctr' leaderboard shows the calculated CTR it is ranked by.
+
+    Args:
+        df: Video rows of the window
+        metrics: Names from RANKING_METRICS
+        n: Videos per leaderboard
+        min_impressions: Product impressions a video needs to enter the 'ctr' leaderboard
+
+    Returns:
+        {metric: [record, ...]} with records best first
+    """
+    boards = {}
+    for metric in metrics:
+        scores = ranking_scores(df, metric, min_impressions)
+        positions = top_n_positions(scores, n)
+        ctr = scores[positions] if metric == 'ctr' else None
+        boards[metric] = video_records(df.iloc[positions], ctr)
+    return boards
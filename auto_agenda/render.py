@@ -0,0 +1,247 @@
+import io
+import os
+import re
+import copy
+from typing import List, Dict, Tuple, Optional
+from docx import Document
+from docx.shared import Pt
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+FONT_NAME = 'Calibri'
+FONT_SIZE = Pt(11)
+
+# {name} for scalar values and {list.field} inside repeated blocks
+PLACEHOLDER_PATTERN = re.compile(r'\{([A-Za-z0-9_ ]+)(?:\.([A-Za-z0-9_]+))?\}')
+# Legacy numbered keys such as {video_2_creator}, filled from list records when present
+NUMBERED_PATTERN = re.compile(r'^(.+)_(\d+)_([A-Za-z]+)$')
+
+# (first run, offset in first run, last run, end offset in last run, placeholder key)
+Site = Tuple[int, int, int, int, str]
+
+
+def _find_sites(paragraph: Paragraph, list_name: Optional[str] = None) -> Tuple[List[Site], List[Tuple[str, str]]]:
+    """
+    Locate placeholders in a paragraph, including ones split across runs.
+
+    Args:
+        paragraph: Paragraph to scan
+        list_name: When given, locate that list's {list_name.field} placeholders as the
+            sites instead of the scalar ones (used to fill a repeated block's clone)
+
+    Returns:
+        (sites, [(list name, field)] for {list.field} placeholders)
+    """
+    runs = paragraph.runs
+    texts = [run.text for run in runs]
+    full_text = ''.join(texts)
+    if '{' not in full_text:
+        return [], []
+
+    run_starts = []
+    position = 0
+    for text in texts:
+        run_starts.append(position)
+        position += len(text)
+
+    def locate(offset: int, is_end: bool) -> Tuple[int, int]:
+        for i in range(len(runs) - 1, -1, -1):
+            if run_starts[i] < offset or (not is_end and run_starts[i] == offset and texts[i]):
+                return i, offset - run_starts[i]
+        return 0, offset
+
+    sites, list_fields = [], []
+    for match in PLACEHOLDER_PATTERN.finditer(full_text):
+        if match.group(2):
+            list_fields.append((match.group(1), match.group(2)))
+        is_site = bool(match.group(2)) and match.group(1) == list_name if list_name else not match.group(2)
+        if not is_site:
+            continue
+        first_run, first_offset = locate(match.start(), is_end=False)
+        last_run, last_offset = locate(match.end(), is_end=True)
+        sites.append((first_run, first_offset, last_run, last_offset, match.group(0)))
+    return sites, list_fields
+
+
+def _fill_sites(paragraph: Paragraph, sites: List[Site], values: Dict[str, str]) -> bool:
+    """Write values into the located sites, right to left so earlier offsets stay valid."""
+    runs = paragraph.runs
+    filled = False
+    for first_run, first_offset, last_run, last_offset, key in reversed(sites):
+        if key not in values:
+            continue
+        value = str(values[key])
+        if first_run == last_run:
+            text = runs[first_run].text
+            runs[first_run].text = text[:first_offset] + value + text[last_offset:]
+        else:
+            runs[first_run].text = runs[first_run].text[:first_offset] + value
+            for i in range(first_run + 1, last_run):
+                runs[i].text = ''
+            runs[last_run].text = runs[last_run].text[last_offset:]
+        filled = True
+    return filled
+
+
+def set_run_font(run, name: str = FONT_NAME, size=FONT_SIZE):
+    """Apply the report font to a run, including the East Asian font slot."""
+    run.font.name = name
+    run.font.size = size
+    run._element.rPr.rFonts.set(qn('w:eastAsia'), name)
+
+
+def _repeat_unit(p_element):
+    """The element cloned per record: the enclosing table row, or the paragraph itself."""
+    ancestor = p_element.getparent()
+    while ancestor is not None:
+        if ancestor.tag == qn('w:tr'):
+            return ancestor
+        if ancestor.tag == qn('w:body'):
+            break
+        ancestor = ancestor.getparent()
+    return p_element
+
+
+class CompiledTemplate:
+    """
+    A Word template scanned once into an index of placeholder locations.
+
+    Scalar {name} placeholders are indexed by paragraph and run offsets, so each
+    render touches only those locations and never compares paragraphs against the
+    whole placeholder dictionary. Consecutive paragraphs or table rows that use
+    {list.field} placeholders form a repeated block, emitted once per record.
+    As in the notebook, every run in the body gets the report font; that is done
+    once here and the normalized template is what each render copies.
+    """
+
+    def __init__(self, template_path: str):
+        self.template_path = template_path
+        with open(template_path, 'rb') as f:
+            doc = Document(io.BytesIO(f.read()))
+        for p_element in self._paragraph_elements(doc):
+            for run in Paragraph(p_element, None).runs:
+                set_run_font(run)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self._template_bytes = buffer.getvalue()
+
+        self.scalar_sites: Dict[int, List[Site]] = {}
+        list_paragraphs: List[Tuple[int, str]] = []
+        for ordinal, p_element in enumerate(self._paragraph_elements(doc)):
+            sites, list_fields = _find_sites(Paragraph(p_element, None))
+            if sites:
+                self.scalar_sites[ordinal] = sites
+            if list_fields:
+                list_paragraphs.append((ordinal, list_fields[0][0]))
+        self.placeholders = sorted({site[4] for sites in self.scalar_sites.values() for site in sites})
+        self.blocks = self._group_blocks(doc, list_paragraphs)
+
+    @staticmethod
+    def _paragraph_elements(doc) -> List:
+        """Every w:p in the body, in document order, including those nested in tables."""
+        return list(doc.element.body.iter(qn('w:p')))
+
+    def _group_blocks(self, doc, list_paragraphs: List[Tuple[int, str]]) -> List[Tuple[str, List[int]]]:
+        """Group repeated-list paragraphs into blocks of adjacent sibling units per list name."""
+        elements = self._paragraph_elements(doc)
+        blocks: List[Tuple[str, List[int]]] = []
+        previous_unit = None
+        for ordinal, list_name in list_paragraphs:
+            unit = _repeat_unit(elements[ordinal])
+            if unit is previous_unit:
+                continue
+            same_block = (blocks and blocks[-1][0] == list_name and previous_unit is not None
+                          and previous_unit.getnext() is unit)
+            if same_block:
+                blocks[-1][1].append(ordinal)
+            else:
+                blocks.append((list_name, [ordinal]))
+            previous_unit = unit
+        return blocks
+
+    def render(self, placeholders: Dict[str, str], output_path: str,
+               lists: Optional[Dict[str, List[Dict[str, str]]]] = None) -> str:
+        """
+        Fill a fresh copy of the template and save it.
+
+        Args:
+            placeholders: {'{name}': value} for scalar placeholders
+            output_path: Where to save the rendered document
+            lists: {list name: [record, ...]} for repeated blocks; records map field -> value.
+                Legacy numbered keys such as {video_1_creator} are filled from the same records.
+
+        Returns:
+            output_path
+        """
+        lists = lists or {}
+        values = dict(placeholders)
+        for key in self.placeholders:
+            if key in values:
+                continue
+            numbered = NUMBERED_PATTERN.match(key[1:-1])
+            if numbered and numbered.group(1) in lists:
+                records = lists[numbered.group(1)]
+                index = int(numbered.group(2)) - 1
+                values[key] = records[index].get(numbered.group(3), '') if index < len(records) else ''
+
+        doc = Document(io.BytesIO(self._template_bytes))
+        elements = self._paragraph_elements(doc)
+        block_units = [(name, [_repeat_unit(elements[o]) for o in ordinals]) for name, ordinals in self.blocks]
+
+        for ordinal, sites in self.scalar_sites.items():
+            _fill_sites(Paragraph(elements[ordinal], None), sites, values)
+
+        for list_name, units in block_units:
+            anchor = units[-1]
+            for rank, record in enumerate(lists.get(list_name, []), start=1):
+                record_values = {f'{{{list_name}.{field}}}': value for field, value in record.items()}
+                record_values.setdefault(f'{{{list_name}.rank}}', str(rank))
+                for unit in units:
+                    clone = copy.deepcopy(unit)
+                    self._fill_clone(clone, list_name, record_values)
+                    anchor.addnext(clone)
+                    anchor = clone
+            for unit in units:
+                unit.getparent().remove(unit)
+
+        doc.save(output_path)
+        return output_path
+
+    @staticmethod
+    def _fill_clone(unit, list_name: str, record_values: Dict[str, str]):
+        """Fill one clone's {list_name.field} placeholders in place, keeping each run's formatting."""
+        paragraphs = [unit] if unit.tag == qn('w:p') else list(unit.iter(qn('w:p')))
+        for p_element in paragraphs:
+            paragraph = Paragraph(p_element, None)
+            sites, _ = _find_sites(paragraph, list_name)
+            # Fields the record lacks are blanked rather than left as raw placeholders
+            _fill_sites(paragraph, sites, {site[4]: record_values.get(site[4], '') for site in sites})
+
+
+# Compiled templates keyed by (path, modification time), reused across renders in a process
+_TEMPLATE_CACHE: Dict[Tuple[str, float], CompiledTemplate] = {}
+
+
+def load_template(template_path: str) -> CompiledTemplate:
+    """Return the compiled template, compiling it only when the file is new or has changed."""
+    key = (os.path.abspath(template_path), os.path.getmtime(template_path))
+    if key not in _TEMPLATE_CACHE:
+        _TEMPLATE_CACHE[key] = CompiledTemplate(template_path)
+    return _TEMPLATE_CACHE[key]
+
+
+def render_document(template_path: str, placeholders: Dict[str, str], output_path: str,
+                    lists: Optional[Dict[str, List[Dict[str, str]]]] = None) -> str:
+    """
+    Fill the Agenda template with placeholder values and top-N lists and save it.
+
+    Args:
+        template_path: Path to Agenda_Template.docx
+        placeholders: {'{placeholder}': value} mapping
+        output_path: Where to save the rendered report
+        lists: Records for repeated blocks (see CompiledTemplate.render)
+
+    Returns:
+        output_path
+    """
+    return load_template(template_path).render(placeholders, output_path, lists)
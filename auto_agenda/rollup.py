@@ -0,0 +1,390 @@
+import os
+import copy
+import json
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from dataclasses import asdict
+from typing import List, Dict, Tuple, Optional
+
+from kpi import (Window, Metric, MetricValue, KPIResult, DERIVED_COLUMNS, VIDEO_METRICS,
+                 calculate_previous_date_range)
+from store import AffiliateStore, VIDEO_TABLE, ORDER_TABLE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIR = 'rollup'
+STATE_FILE = 'state.json'
+DEFAULT_TOP_K = 10
+# Bumped when the way rollup rows are computed changes, so existing rollups are rebuilt
+ROLLUP_VERSION = 2
+# Per-video measures kept in the creator/product/video daily rollup
+VIDEO_MEASURES = {
+    'gmv': 'Video Revenue ($)',
+    'vv': 'VV',
+    'impressions': 'Product Impressions',
+    'clicks': 'Product Clicks',
+    'likes': 'Likes',
+    'shares': 'Shares',
+    'comments': 'Comments',
+}
+RANK_METRICS = {'gmv': 'Video Revenue ($)', 'vv': 'VV'}
+# videos_daily column -> video export column, for rebuilding export-shaped rows from the rollup
+EXPORT_COLUMNS = {'day': 'Time', 'creator': 'Creator name', 'product': 'Products', 'video_id': 'Video ID',
+                  'ctr': 'CTR', **VIDEO_MEASURES}
+
+
+def day_range(start, end) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Half-open [first, stop) day range for an inclusive timestamp window.
+
+    A window ending exactly at midnight does not cover that day, so a previous
+    window that ends where the current one starts shares no day with it. A start
+    of None means from the first stored day.
+    """
+    first = pd.Timestamp.min.ceil('D') if start is None else pd.Timestamp(start).floor('D')
+    return first, pd.Timestamp(end).ceil('D')
+
+
+def rollup_fingerprint(metrics: List[Metric], top_k: int) -> str:
+    """Hash of the settings the rollup tables were built with; a change means a full rebuild."""
+    settings = {'metrics': [asdict(m) for m in metrics], 'top_k': top_k, 'version': ROLLUP_VERSION}
+    return hashlib.md5(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _day_total_columns(metric: Metric) -> List[str]:
+    """Additive day-total columns a metric needs so that window values come from prefix sums."""
+    if metric.ratio_of is not None:
+        return []
+    if metric.agg in ('sum', 'size', 'count'):
+        return [metric.name]
+    if metric.agg == 'mean':
+        return [f'{metric.name}_sum', f'{metric.name}_count']
+    raise ValueError(f"Metric {metric.name} uses '{metric.agg}', which cannot be answered from daily totals")
+
+
+class DailyRollup:
+    """
+    Incrementally maintained daily rollups of the affiliate store.
+
+    Four tables live under <store>/rollup/:
+      - videos_daily: one row per day/creator/product/video with GMV, VV, impressions,
+        clicks, likes, shares, comments and the export's CTR; for_brand() rebuilds the
+        other video tables from it for one brand
+      - orders_daily: order counts per day and product
+      - video_totals: additive per-day totals for every registered video metric
+      - day_top: the top_k videos of each day by GMV and by VV
+
+    Window metrics are differences of prefix sums over the day totals, and window top-N
+    lists merge the per-day top_k lists, so comparing two windows costs O(days)
+    instead of O(rows). Windows are resolved to whole days with day_range.
+    """
+
+    def __init__(self, store: AffiliateStore, metrics: List[Metric] = VIDEO_METRICS, top_k: Optional[int] = None):
+        """
+        Args:
+            store: Store the rollup summarizes
+            metrics: Metric registry kept as day totals
+            top_k: Videos kept per day for top lists; None keeps the value the rollup was
+                built with (DEFAULT_TOP_K for a new rollup)
+
+        The tables are rebuilt on the next refresh() when metrics or top_k differ from
+        the ones they were built with.
+        """
+        for m in metrics:
+            _day_total_columns(m)  # rejects metrics that are not additive over days
+        self.store = store
+        self.metrics = metrics
+        self.root = os.path.join(store.root, ROLLUP_DIR)
+        os.makedirs(self.root, exist_ok=True)
+        self.top_k = top_k or self._load_state().get('top_k', DEFAULT_TOP_K)
+        self.brand: Optional[str] = None
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._prefix: Optional[pd.DataFrame] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f'{name}.parquet')
+
+    def _load_state(self) -> Dict:
+        path = os.path.join(self.root, STATE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        with open(os.path.join(self.root, STATE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+
+    def table(self, name: str) -> pd.DataFrame:
+        """Load (and cache) one rollup table."""
+        if name not in self._tables:
+            path = self._path(name)
+            self._tables[name] = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame({'day': []})
+        return self._tables[name]
+
+    def _replace_days(self, name: str, days: set, new_rows: pd.DataFrame):
+        """Swap the rows of the given days in a rollup table for freshly computed ones."""
+        stored = self.table(name)
+        if len(stored):
+            stored = stored[~stored['day'].isin(days)]
+        updated = pd.concat([stored, new_rows], ignore_index=True) if len(stored) else new_rows
+        updated = updated.sort_values('day', kind='stable').reset_index(drop=True)
+        updated.to_parquet(self._path(name), index=False)
+        self._tables[name] = updated
+
+    def _video_rows(self, videos: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Build videos_daily, video_totals and day_top rows for a set of days."""
+        videos = videos.assign(day=videos['Time'].dt.normalize())
+        daily = videos[['day', 'Creator name', 'Products', 'Video ID']].rename(
+            columns={'Creator name': 'creator', 'Products': 'product', 'Video ID': 'video_id'})
+        for name, column in VIDEO_MEASURES.items():
+            daily[name] = videos[column].fillna(0)
+        if 'CTR' in videos.columns:
+            daily['ctr'] = videos['CTR']
+
+        per_row = {}
+        for m in self.metrics:
+            if m.ratio_of is not None:
+                continue
+            values = videos[m.column] if m.column in videos.columns else DERIVED_COLUMNS[m.column](videos)
+            if m.agg == 'mean':
+                per_row[f'{m.name}_sum'] = values.fillna(0)
+                per_row[f'{m.name}_count'] = values.notna().astype(int)
+            elif m.agg == 'size':
+                per_row[m.name] = 1
+            elif m.agg == 'count':
+                per_row[m.name] = values.notna().astype(int)
+            else:
+                per_row[m.name] = values.fillna(0)
+        totals = pd.DataFrame(per_row, index=videos.index).groupby(videos['day']).sum()
+        totals = totals.rename_axis('day').reset_index()
+
+        keep = ['day', 'Creator name', 'Products', 'Video ID', 'Video Revenue ($)', 'VV', 'Likes', 'Shares',
+                'Comments', 'CTR']
+        top_rows = []
+        for rank_metric, column in RANK_METRICS.items():
+            ranked = videos.sort_values(column, ascending=False, kind='stable').groupby('day').head(self.top_k)
+            top_rows.append(ranked[[c for c in keep if c in ranked.columns]].assign(rank_metric=rank_metric))
+        day_top = pd.concat(top_rows, ignore_index=True)
+        return {'videos_daily': daily.reset_index(drop=True), 'video_totals': totals, 'day_top': day_top}
+
+    def _clear(self):
+        """Delete every rollup table so the next refresh rebuilds them from all partitions."""
+        for name in ('videos_daily', 'orders_daily', 'video_totals', 'day_top'):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        self._tables = {}
+
+    def refresh(self) -> int:
+        """
+        Recompute rollup rows for store partitions added or rewritten since the last refresh.
+
+        Partitions are tracked as '<table>/<YYYY-MM-DD>' with their modification time,
+        so the store can be opened through any path. A state file from an older layout,
+        or one built with other metrics or top_k, triggers a full rebuild.
+
+        Returns:
+            Number of days recomputed
+        """
+        if self.brand is not None:
+            raise ValueError("A for_brand() view is read-only; refresh the full rollup instead")
+        state = self._load_state()
+        fingerprint = rollup_fingerprint(self.metrics, self.top_k)
+        if state and state.get('fingerprint') != fingerprint:
+            logger.info("Rollup settings changed, rebuilding every day")
+            self._clear()
+            state = {}
+        state.update(fingerprint=fingerprint, top_k=self.top_k)
+        known = state.get('partitions', {})
+        partitions = {}
+        changed = {}
+        for table in (VIDEO_TABLE, ORDER_TABLE):
+            for day, partition_file in self.store.partition_days(table).items():
+                key = f"{table}/{day:%Y-%m-%d}"
+                partitions[key] = os.path.getmtime(partition_file)
+                if known.get(key) != partitions[key]:
+                    changed.setdefault(table, {})[day] = partition_file
+        # Days whose partitions disappeared (e.g. rows moved by dedupe) are dropped from the rollup
+        for key in set(known) - set(partitions):
+            table, day = key.split('/')
+            changed.setdefault(table, {}).setdefault(pd.Timestamp(day), None)
+        state['partitions'] = partitions
+        if not changed:
+            self._save_state(state)
+            return 0
+
+        video_days = changed.get(VIDEO_TABLE, {})
+        if video_days:
+            files = [f for f in video_days.values() if f]
+            videos = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True) if files else None
+            days = set(video_days)
+            if videos is not None and len(videos):
+                rows = self._video_rows(videos)
+            else:
+                rows = {'videos_daily': pd.DataFrame({'day': []}), 'video_totals': pd.DataFrame({'day': []}),
+                        'day_top': pd.DataFrame({'day': []})}
+            self._replace_days('videos_daily', days, rows['videos_daily'])
+            self._replace_days('video_totals', days, rows['video_totals'])
+            self._replace_days('day_top', days, rows['day_top'])
+
+        order_days = changed.get(ORDER_TABLE, {})
+        if order_days:
+            files = [f for f in order_days.values() if f]
+            orders = pd.concat([pd.read_parquet(f, columns=['Paid Time', 'Product Name']) for f in files],
+                               ignore_index=True) if files else pd.DataFrame({'Paid Time': [], 'Product Name': []})
+            # Lines without a product name still count towards the order totals
+            orders_daily = (orders.groupby([orders['Paid Time'].dt.normalize().rename('day'), 'Product Name'],
+                                           dropna=False)
+                            .size().rename('orders').reset_index().rename(columns={'Product Name': 'product'}))
+            self._replace_days('orders_daily', set(order_days), orders_daily)
+
+        self._save_state(state)
+        self._prefix = None
+        recomputed = len(set(video_days) | set(order_days))
+        logger.info(f"Refreshed rollup for {recomputed} days")
+        return recomputed
+
+    def _prefix_sums(self) -> pd.DataFrame:
+        """Cumulative day totals over a dense daily index, with a leading zero row."""
+        if self._prefix is None:
+            totals = self.table('video_totals').set_index('day')
+            orders = self.table('orders_daily')
+            if len(orders):
+                totals = totals.join(orders.groupby('day')['orders'].sum(), how='outer')
+            if len(totals) == 0:
+                self._prefix = pd.DataFrame()
+                return self._prefix
+            days = pd.date_range(totals.index.min(), totals.index.max(), freq='D')
+            dense = totals.reindex(days).fillna(0)
+            zero = pd.DataFrame(0, index=[days[0] - pd.Timedelta(days=1)], columns=dense.columns)
+            self._prefix = pd.concat([zero, dense]).cumsum()
+        return self._prefix
+
+    def window_totals(self, start, end) -> pd.Series:
+        """Summed day totals over day_range(start, end) = [first, stop), as P[stop - 1] - P[first - 1]."""
+        return self._day_totals(*day_range(start, end))
+
+    def history_totals(self, end) -> pd.Series:
+        """Summed day totals from the first stored day up to end, including the order count."""
+        return self.window_totals(None, end)
+
+    def _day_totals(self, first_day: pd.Timestamp, stop_day: pd.Timestamp) -> pd.Series:
+        prefix = self._prefix_sums()
+        if prefix.empty:
+            return pd.Series(dtype=float)
+        one_day = pd.Timedelta(days=1)
+        # Row 0 of the prefix is the zero row before the first stored day
+        lowest, highest = prefix.index[0] + one_day, prefix.index[-1] + one_day
+        first_day = min(max(first_day, lowest), highest)
+        stop_day = min(max(stop_day, lowest), highest)
+        if stop_day <= first_day:
+            return pd.Series(0.0, index=prefix.columns)
+        return prefix.loc[stop_day - one_day] - prefix.loc[first_day - one_day]
+
+    def _metric_value(self, metric: Metric, totals: pd.Series, values: Dict[str, float]) -> float:
+        if metric.ratio_of is not None:
+            numerator, denominator = values.get(metric.ratio_of[0]), values.get(metric.ratio_of[1])
+            # Ratio inputs are already scaled by their own metrics' scale (1 for sums)
+            return numerator / denominator * metric.scale if denominator else float('nan')
+        if metric.agg == 'mean':
+            count = totals.get(f'{metric.name}_count', 0)
+            return totals.get(f'{metric.name}_sum', 0) / count * metric.scale if count else float('nan')
+        return float(totals.get(metric.name, 0)) * metric.scale
+
+    def compare(self, current: Window, previous: Optional[Window] = None) -> KPIResult:
+        """
+        Window KPIs and deltas from prefix sums, in the same KPIResult shape as kpi.compute_kpis.
+
+        Args:
+            current: (start, end) of the reporting window
+            previous: Comparison window; defaults to calculate_previous_date_range
+
+        Returns:
+            KPIResult for the registered metrics
+        """
+        current = (pd.Timestamp(current[0]), pd.Timestamp(current[1]))
+        if previous is None:
+            previous = calculate_previous_date_range(current[0].to_pydatetime(), current[1].to_pydatetime())
+        previous = (pd.Timestamp(previous[0]), pd.Timestamp(previous[1]))
+
+        current_days = day_range(*current)
+        previous_days = day_range(*previous)
+        if previous_days[0] < current_days[0]:
+            # As in compute_kpis, a day claimed by both windows belongs to the current one
+            previous_days = (previous_days[0], min(previous_days[1], current_days[0]))
+
+        result = KPIResult(current_window=current, previous_window=previous)
+        window_values = {}
+        for label, days in (('current', current_days), ('previous', previous_days)):
+            totals = self._day_totals(*days)
+            values = {}
+            for m in self.metrics:
+                values[m.name] = self._metric_value(m, totals, values)
+            window_values[label] = values
+        for m in self.metrics:
+            result.metrics[m.name] = MetricValue(m, window_values['current'][m.name],
+                                                 window_values['previous'][m.name])
+        return result
+
+    def top_videos(self, start, end, rank_metric: str = 'gmv', n: int = 3) -> pd.DataFrame:
+        """
+        Top n videos posted in a window, merged from the per-day top_k lists.
+
+        The global top n is contained in the union of per-day top lists as long as n <= top_k.
+        A start of None means from the first stored day.
+        """
+        built_top_k = self._load_state().get('top_k', self.top_k)
+        if n > min(self.top_k, built_top_k):
+            raise ValueError(f"n={n} exceeds the rollup's per-day top_k={min(self.top_k, built_top_k)}; "
+                             f"refresh it with a larger top_k")
+        day_top = self.table('day_top')
+        if len(day_top) == 0:
+            return day_top
+        first_day, stop_day = day_range(start, end)
+        in_window = (day_top['day'] >= first_day) & (day_top['day'] < stop_day)
+        candidates = day_top[(day_top['rank_metric'] == rank_metric) & in_window]
+        return candidates.nlargest(n, RANK_METRICS[rank_metric]).drop(columns='rank_metric')
+
+    def for_brand(self, brand: Optional[str]) -> 'DailyRollup':
+        """
+        Read-only view of the rollup limited to videos and orders whose product mentions brand.
+
+        The view's day totals and top lists are rebuilt in memory from videos_daily and
+        orders_daily, which are far smaller than the raw partitions. Build one view per
+        brand and reuse it for every window; an empty brand returns the rollup itself.
+        """
+        if not brand:
+            return self
+        daily = self.table('videos_daily')
+        mentions = daily['product'].astype(str).str.contains(brand, case=False, regex=False, na=False)
+        videos = daily[mentions].rename(columns=EXPORT_COLUMNS)
+        if len(videos):
+            tables = self._video_rows(videos)
+        else:
+            tables = {name: pd.DataFrame({'day': []}) for name in ('videos_daily', 'video_totals', 'day_top')}
+        orders = self.table('orders_daily')
+        if len(orders):
+            orders = orders[orders['product'].astype(str).str.contains(brand, case=False, regex=False, na=False)]
+        tables['orders_daily'] = orders
+
+        view = copy.copy(self)
+        view.brand = brand
+        view._tables = tables
+        view._prefix = None
+        return view
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the daily rollup of an AffiliateStore.")
+    parser.add_argument('store', help="AffiliateStore root directory")
+    parser.add_argument('--top-k', type=int,
+                        help=f"Videos kept per day for top lists (default: as built, else {DEFAULT_TOP_K})")
+    args = parser.parse_args()
+    DailyRollup(AffiliateStore(args.store), top_k=args.top_k).refresh()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+
+from kpi import Window
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VIDEO_TABLE = 'videos'
+ORDER_TABLE = 'orders'
+MANIFEST_FILE = 'manifest.json'
+
+# Per-table ingest settings: timestamp column, dedupe key (None for keyless tables), numeric
+# columns, and the text columns reports rely on (part of the schema of an empty load)
+TABLES = {
+    VIDEO_TABLE: {
+        'time_column': 'Time',
+        'key': 'Video ID',
+        'text_columns': ['Creator name', 'Products', 'Video ID', 'CTR'],
+        'numeric_columns': ['Video Revenue ($)', 'VV', 'Likes', 'Shares', 'Comments',
+                            'Product Impressions', 'Product Clicks'],
+    },
+    ORDER_TABLE: {
+        'time_column': 'Paid Time',
+        # One row per line item, so an Order ID repeats; the export has no line-item key
+        'key': None,
+        'text_columns': ['Order ID', 'Product Name'],
+        'numeric_columns': ['Quantity', 'Sku Quantity of return', 'SKU Unit Original Price',
+                            'SKU Subtotal Before Discount', 'SKU Platform Discount', 'SKU Seller Discount',
+                            'SKU Subtotal After Discount', 'Shipping Fee After Discount',
+                            'Original Shipping Fee', 'Shipping Fee Seller Discount',
+                            'Shipping Fee Platform Discount', 'Taxes', 'Order Amount', 'Order Refund Amount'],
+    },
+}
+ORDER_TIME_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+
+
+def clean_gmv_column(df: pd.DataFrame, column_name: str) -> pd.DataFrame:
+    """Strip '$' and ',' from a currency column and convert it to numbers."""
+    df[column_name] = pd.to_numeric(df[column_name].replace(r'[\$,]', '', regex=True), errors='coerce')
+    return df
+
+
+def read_video_export(path: str) -> pd.DataFrame:
+    """Parse an affiliate video export (Excel, header on the third row) into typed columns."""
+    df = pd.read_excel(path, header=2)
+    df = clean_gmv_column(df, 'Video Revenue ($)')
+    df['Time'] = pd.to_datetime(df['Time'], errors='coerce')
+    df['Video ID'] = df['Video ID'].astype(str)
+    return _type_columns(df, VIDEO_TABLE)
+
+
+def read_order_export(path: str) -> pd.DataFrame:
+    """Parse an order export (e.g. milk_order.csv) into typed columns."""
+    df = pd.read_csv(path, dtype=str)
+    df['Paid Time'] = pd.to_datetime(df['Paid Time'].str.strip(), format=ORDER_TIME_FORMAT, errors='coerce')
+    return _type_columns(df, ORDER_TABLE)
+
+
+def _type_columns(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Coerce known numeric columns to numbers and the remaining text columns to strings."""
+    settings = TABLES[table]
+    for column in settings['numeric_columns']:
+        if column in df.columns:
+            values = df[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                # Amounts may carry a currency symbol or code and thousands separators
+                values = values.astype(str).str.replace(r'[^0-9.\-]', '', regex=True)
+            df[column] = pd.to_numeric(values, errors='coerce')
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].astype('string')
+    return df
+
+
+class AffiliateStore:
+    """
+    Date-partitioned Parquet store for affiliate video and order exports.
+
+    Each export is parsed once at ingest and written to one Parquet file per day
+    under <root>/<table>/date=YYYY-MM-DD/. Readers then load only the day
+    partitions that overlap the requested windows.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._manifest_path = os.path.join(root, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict[str, str]:
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, str]):
+        with open(self._manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def _file_signature(path: str) -> str:
+        """Identify an export by name, size and modification time, so re-runs skip unchanged files."""
+        stat = os.stat(path)
+        raw = f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def _partition_dir(self, table: str, day) -> str:
+        return os.path.join(self.root, table, f"date={pd.Timestamp(day).strftime('%Y-%m-%d')}")
+
+    def ingest(self, path: str, table: str, force: bool = False) -> int:
+        """
+        Convert one export into day partitions, deduplicating on the table key.
+
+        Rows from the new export replace stored rows with the same key, so a later
+        export carrying updated stats for a video wins over an earlier one. Tables
+        without a key (orders, one row per line item) cannot be matched row by row,
+        so the new export replaces the stored rows of every day it covers instead.
+
+        Args:
+            path: Excel video export or order CSV
+            table: VIDEO_TABLE or ORDER_TABLE
+            force: Re-ingest even if this exact file was ingested before
+
+        Returns:
+            Number of rows written (0 if the file was skipped)
+        """
+        manifest = self._load_manifest()
+        signature = self._file_signature(path)
+        if signature in manifest and not force:
+            logger.info(f"Skipping {path}: already ingested on {manifest[signature]}")
+            return 0
+
+        df = read_video_export(path) if table == VIDEO_TABLE else read_order_export(path)
+        settings = TABLES[table]
+        time_column, key = settings['time_column'], settings['key']
+
+        missing_time = df[time_column].isna()
+        if missing_time.any():
+            logger.warning(f"Dropping {missing_time.sum()} rows with unparseable {time_column} from {path}")
+            df = df[~missing_time]
+        keyed = key is not None and key in df.columns
+        if keyed:
+            df = df.drop_duplicates(key, keep='last')
+            self._drop_keys(table, df[key], exclude_days=set(df[time_column].dt.normalize()))
+
+        for day, day_df in df.groupby(df[time_column].dt.normalize()):
+            partition_dir = self._partition_dir(table, day)
+            partition_file = os.path.join(partition_dir, 'part.parquet')
+            if keyed and os.path.exists(partition_file):
+                stored = pd.read_parquet(partition_file)
+                # Any incoming key, not just this day's, since a row may have moved between days
+                stored = stored[~stored[key].isin(df[key])]
+                day_df = pd.concat([stored, day_df], ignore_index=True)
+            os.makedirs(partition_dir, exist_ok=True)
+            day_df.sort_values(time_column).to_parquet(partition_file, index=False)
+
+        manifest[signature] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._save_manifest(manifest)
+        logger.info(f"Ingested {len(df)} rows from {path} into {table}")
+        return len(df)
+
+    def _drop_keys(self, table: str, keys: pd.Series, exclude_days: set):
+        """Remove keys from partitions outside exclude_days, in case a row's timestamp moved."""
+        keys = set(keys)
+        key = TABLES[table]['key']
+        for partition_file in self._partition_files(table):
+            day = pd.Timestamp(os.path.basename(os.path.dirname(partition_file))[len('date='):])
+            if day in exclude_days:
+                continue
+            stored = pd.read_parquet(partition_file, columns=[key])
+            overlap = stored[key].isin(keys)
+            if overlap.any():
+                stored = pd.read_parquet(partition_file)
+                stored[~overlap.values].to_parquet(partition_file, index=False)
+
+    def _partition_files(self, table: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, table, 'date=*', 'part.parquet')))
+
+    def partition_days(self, table: str) -> Dict[pd.Timestamp, str]:
+        """Map each stored day of a table to its partition file."""
+        return {pd.Timestamp(os.path.basename(os.path.dirname(f))[len('date='):]): f
+                for f in self._partition_files(table)}
+
+    def partitions_for(self, table: str, windows: Iterable[Window]) -> List[str]:
+        """Partition files whose day overlaps any of the windows."""
+        windows = [(pd.Timestamp(start).normalize(), pd.Timestamp(end)) for start, end in windows]
+        selected = []
+        for partition_file in self._partition_files(table):
+            day = pd.Timestamp(os.path.basename(os.path.dirname(partition_file))[len('date='):])
+            if any(start <= day <= end for start, end in windows):
+                selected.append(partition_file)
+        return selected
+
+    def _empty_frame(self, table: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        A zero-row frame with the table's columns and dtypes, so callers can treat no rows like any other load.
+
+        The schema comes from a stored partition when there is one, else from TABLES.
+        """
+        stored = self._partition_files(table)
+        if stored:
+            import pyarrow.parquet as pq
+            df = pq.read_schema(stored[0]).empty_table().to_pandas()
+        else:
+            settings = TABLES[table]
+            df = pd.DataFrame({settings['time_column']: pd.Series(dtype='datetime64[ns]')})
+            for column in settings['numeric_columns']:
+                df[column] = pd.Series(dtype=float)
+            for column in settings['text_columns']:
+                df[column] = pd.Series(dtype='string')
+        if columns is not None:
+            df = df.reindex(columns=columns)
+        return df
+
+    def load(self, table: str, windows: Iterable[Window], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load rows falling in any of the windows, reading only overlapping partitions.
+
+        Args:
+            table: VIDEO_TABLE or ORDER_TABLE
+            windows: (start, end) pairs, inclusive
+            columns: Optional subset of columns to read (the time column is always included)
+
+        Returns:
+            Rows sorted by the table's time column
+        """
+        windows = [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in windows]
+        time_column = TABLES[table]['time_column']
+        if columns is not None and time_column not in columns:
+            columns = [time_column] + list(columns)
+
+        files = self.partitions_for(table, windows)
+        if not files:
+            return self._empty_frame(table, columns)
+        df = pd.concat([pd.read_parquet(f, columns=columns) for f in files], ignore_index=True)
+        mask = pd.Series(False, index=df.index)
+        for start, end in windows:
+            mask |= df[time_column].between(start, end)
+        return df[mask].sort_values(time_column, kind='stable').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest affiliate exports into the Parquet store.")
+    parser.add_argument('store', help="Store root directory")
+    parser.add_argument('--videos', nargs='*', default=[], help="Affiliate video exports (.xlsx)")
+    parser.add_argument('--orders', nargs='*', default=[], help="Order exports (.csv)")
+    parser.add_argument('--force', action='store_true', help="Re-ingest files that were ingested before")
+    parser.add_argument('--no-rollup', action='store_true', help="Skip refreshing the daily rollup after ingest")
+    args = parser.parse_args()
+
+    store = AffiliateStore(args.store)
+    for path in args.videos:
+        store.ingest(path, VIDEO_TABLE, force=args.force)
+    for path in args.orders:
+        store.ingest(path, ORDER_TABLE, force=args.force)
+    if not args.no_rollup:
+        # Imported here because rollup.py builds on this module
+        from rollup import DailyRollup
+        DailyRollup(store).refresh()
+
+
+if __name__ == "__main__":
+    main()
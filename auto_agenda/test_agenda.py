@@ -0,0 +1,31 @@
+import pandas as pd
+
+from agenda import SortedFrame, build_report_placeholders, VIDEO_TIME_COLUMN, ORDER_TIME_COLUMN
+
+
+def _videos(rows):
+    return pd.DataFrame([{'Video ID': video_id, VIDEO_TIME_COLUMN: pd.Timestamp(time), 'Video Revenue ($)': gmv,
+                          'VV': 10, 'Likes': 1, 'Shares': 0, 'Comments': 0, 'Product Impressions': 10,
+                          'Product Clicks': 1} for video_id, time, gmv in rows])
+
+
+def _orders(rows):
+    return pd.DataFrame([{ORDER_TIME_COLUMN: pd.Timestamp(time), 'Product Name': product} for time, product in rows])
+
+
+def test_row_on_shared_window_boundary_counts_once():
+    # A 10-day window falls through to the fallback branch, so the previous window ends at the current start
+    current = (pd.Timestamp('2024-06-01 00:00:00'), pd.Timestamp('2024-06-11 00:00:00'))
+    videos = SortedFrame(_videos([('v0', '2024-05-25 12:00:00', 40),
+                                  ('v1', '2024-06-01 00:00:00', 100),
+                                  ('v2', '2024-06-05 12:00:00', 50)]), VIDEO_TIME_COLUMN)
+    orders = SortedFrame(_orders([('2024-06-01 00:00:00', 'Milk'), ('2024-06-03 00:00:00', 'Milk')]),
+                         ORDER_TIME_COLUMN)
+
+    placeholders = build_report_placeholders(videos, orders, current)
+
+    assert placeholders['{total_gmv}'] == '$150'
+    assert placeholders['{total_posts}'] == '2'
+    assert placeholders['{new_product}'] == '2'
+    # The previous window keeps only v0, so GMV grew from 40 to 150
+    assert placeholders['{gmv_comparison}'] == 'increase by 275.00%'
@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+from docx import Document
+
+from store import AffiliateStore, VIDEO_TABLE
+from batch import ReportJob, load_jobs, run_batch
+
+
+def test_batch_renders_windows_without_rows(tmp_path):
+    store = AffiliateStore(str(tmp_path / 'store'))
+    # Videos on one day only and no orders ingested at all
+    videos = pd.DataFrame({'Time': [pd.Timestamp('2024-06-03 10:00:00')], 'Creator name': ['creator'],
+                           'Products': ['Milk'], 'Video ID': ['1'], 'Video Revenue ($)': [10.0], 'VV': [100],
+                           'Likes': [1], 'Shares': [0], 'Comments': [0], 'Product Impressions': [50],
+                           'Product Clicks': [5], 'CTR': ['10%']})
+    partition_dir = store._partition_dir(VIDEO_TABLE, '2024-06-03')
+    os.makedirs(partition_dir)
+    videos.to_parquet(os.path.join(partition_dir, 'part.parquet'), index=False)
+
+    template = Document()
+    template.add_paragraph('GMV {total_gmv}, orders {new_product}')
+    template_path = str(tmp_path / 'template.docx')
+    template.save(template_path)
+
+    jobs = [ReportJob(pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-07 23:59:59'), 'milk'),
+            ReportJob(pd.Timestamp('2025-01-01'), pd.Timestamp('2025-01-07 23:59:59'))]
+    outputs = run_batch(store.root, jobs, template_path, str(tmp_path / 'reports'), workers=1)
+
+    assert [Document(path).paragraphs[0].text for path in outputs] == ['GMV $10, orders 0', 'GMV $0, orders 0']
+
+
+def test_load_jobs_extends_date_only_end_to_end_of_day(tmp_path):
+    jobs_path = tmp_path / 'jobs.csv'
+    jobs_path.write_text('start,end,brand\n2024-06-01,2024-06-07,milk\n'
+                         '2024-06-01 08:00:00,2024-06-07 20:00:00,\n')
+
+    jobs = load_jobs(str(jobs_path))
+
+    assert jobs[0] == ReportJob(pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-07 23:59:59'), 'milk')
+    assert jobs[1] == ReportJob(pd.Timestamp('2024-06-01 08:00:00'), pd.Timestamp('2024-06-07 20:00:00'))
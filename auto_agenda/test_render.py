@@ -0,0 +1,21 @@
+from docx import Document
+
+from render import render_document
+
+
+def test_repeated_rows_keep_run_formatting(tmp_path):
+    template = Document()
+    cell = template.add_table(rows=1, cols=1).cell(0, 0).paragraphs[0]
+    cell.add_run('Creator: ').bold = True
+    cell.add_run('{video.cre')
+    cell.add_run('ator} ({video.rank}){video.missing}')
+    template_path = str(tmp_path / 'template.docx')
+    template.save(template_path)
+
+    output_path = render_document(template_path, {}, str(tmp_path / 'report.docx'),
+                                  {'video': [{'creator': 'a'}, {'creator': 'b'}]})
+
+    rows = [[(run.text, run.bold) for run in row.cells[0].paragraphs[0].runs]
+            for row in Document(output_path).tables[0].rows]
+    assert rows == [[('Creator: ', True), ('a', None), (' (1)', None)],
+                    [('Creator: ', True), ('b', None), (' (2)', None)]]
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pandas as pd
+
+from kpi import compute_kpis, VIDEO_METRICS
+from store import AffiliateStore, VIDEO_TABLE
+from rollup import DailyRollup
+
+
+def _write_videos(store: AffiliateStore, videos: pd.DataFrame):
+    for day, day_df in videos.groupby(videos['Time'].dt.normalize()):
+        partition_dir = store._partition_dir(VIDEO_TABLE, day)
+        os.makedirs(partition_dir, exist_ok=True)
+        day_df.to_parquet(os.path.join(partition_dir, 'part.parquet'), index=False)
+
+
+def _random_videos(rows: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    # Half-hour offsets keep every row off midnight, where day and timestamp windows legitimately differ
+    times = pd.Timestamp('2024-05-10') + pd.to_timedelta(rng.integers(0, 36 * 48, rows) * 30 + 15, unit='min')
+    return pd.DataFrame({
+        'Time': times,
+        'Creator name': [f'creator{i % 7}' for i in range(rows)],
+        'Products': [f'product{i % 5}' for i in range(rows)],
+        'Video ID': [str(i) for i in range(rows)],
+        'Video Revenue ($)': rng.uniform(0, 100, rows).round(2),
+        'VV': rng.integers(0, 1000, rows),
+        'Likes': rng.integers(0, 50, rows),
+        'Shares': rng.integers(0, 10, rows),
+        'Comments': rng.integers(0, 10, rows),
+        'Product Impressions': rng.integers(1, 500, rows),
+        'Product Clicks': rng.integers(0, 50, rows),
+    })
+
+
+def test_compare_matches_compute_kpis_for_fallback_windows(tmp_path):
+    videos = _random_videos()
+    store = AffiliateStore(str(tmp_path))
+    _write_videos(store, videos)
+    rollup = DailyRollup(store)
+    rollup.refresh()
+
+    # A 14-day-minus-a-second window uses the fallback branch: the previous window ends at the current start
+    current = (pd.Timestamp('2024-06-01 00:00:00'), pd.Timestamp('2024-06-14 23:59:59'))
+    expected = compute_kpis(videos, 'Time', current, metrics=VIDEO_METRICS)
+    actual = rollup.compare(current)
+
+    for m in VIDEO_METRICS:
+        assert np.isclose(actual[m.name].current, expected[m.name].current), m.name
+        assert np.isclose(actual[m.name].previous, expected[m.name].previous), m.name
+
+
+def test_refresh_through_another_path_keeps_rollup(tmp_path, monkeypatch):
+    videos = _random_videos()
+    _write_videos(AffiliateStore(str(tmp_path / 'store')), videos)
+    monkeypatch.chdir(tmp_path)
+    DailyRollup(AffiliateStore('store')).refresh()
+
+    rollup = DailyRollup(AffiliateStore(str(tmp_path / 'store')))
+    assert rollup.refresh() == 0
+    assert rollup.history_totals('2024-07-01')['posts'] == len(videos)
+
+
+def test_rollup_rebuilds_when_top_k_changes(tmp_path):
+    store = AffiliateStore(str(tmp_path))
+    _write_videos(store, _random_videos())
+    DailyRollup(store, top_k=2).refresh()
+
+    assert DailyRollup(store).top_k == 2
+    rollup = DailyRollup(store, top_k=5)
+    rollup.refresh()
+    top = rollup.top_videos('2024-05-10', '2024-05-10 23:59:59', 'gmv', n=5)
+    assert len(top) == 5
@@ -0,0 +1,269 @@
+import json
+import hashlib
+import pandas as pd
+import numpy as np
+from typing import List, Dict, Tuple, Optional
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# TikTok main -> detailed category taxonomy
+CATEGORY_MAPPING = {
+    "Home Supplies": [
+        "Home Organizers", "Bathroom Supplies", "Home Decor", "Home Care Supplies",
+        "Laundry Tools & Accessories", "Festive & Party Supplies", "Miscellaneous Home"
+    ],
+    "Kitchenware": [
+        "Barbecue", "Bar & Wine Utensils", "Bakeware", "Cookware", "Cutlery & Tableware",
+        "Drinkware", "Kitchen Utensils & Gadgets", "Tea & Coffeeware", "Kitchen Knives"
+    ],
+    "Phones & Electronics": [
+        "Phone Accessories", "Cameras & Photography", "Audio & Video", "Gaming & Consoles",
+        "Smart & Wearable Devices", "Education Devices", "Universal Accessories",
+        "Tablet & Computer Accessories", "Phones & Tablets"
+    ],
+    "Beauty & Personal Care": [
+        "Men's Care", "Personal Care Appliances", "Eye & Ear Care", "Nasal & Oral Care",
+        "Feminine Care", "Perfume", "Special Personal Care", "Makeup", "Skincare",
+        "Haircare & Styling", "Hand, Foot & Nail Care", "Bath & Body Care"
+    ],
+    "Shoes": [
+        "Women's Shoes", "Men's Shoes", "Shoe Accessories"
+    ],
+    "Womenswear & Underwear": [
+        "Women's Tops", "Women's Bottoms", "Women's Dresses", "Women's Special Clothing",
+        "Women's Suits & Overalls", "Women's Underwear", "Women's Sleepwear & Loungewear"
+    ],
+    "Household Appliances": [
+        "Kitchen Appliances", "Home Appliances", "Large Home Appliances", "Commercial Appliances"
+    ],
+    "Textiles & Soft Furnishings": [
+        "Bedding", "Household Textiles", "Fabrics & Sewing Supplies"
+    ],
+    "Sports & Outdoor": [
+        "Sport & Outdoor Clothing", "Sports Footwear", "Sports & Outdoor Accessories",
+        "Ball Sports Equipment", "Water Sports Equipment", "Winter Sports Equipment",
+        "Fitness Equipment", "Camping & Hiking Equipment", "Leisure & Outdoor Recreation Equipment",
+        "Swimwear, Surfwear & Wetsuits", "Fan Shop"
+    ],
+    "Baby & Maternity": [
+        "Nursing & Feeding", "Maternity Supplies"
+    ],
+    "Pet Supplies": [
+        "Dog & Cat Healthcare", "Dog & Cat Accessories", "Fish & Aquatic Supplies",
+        "Reptile & Amphibian Supplies", "Bird Supplies", "Small Animal Supplies",
+        "Farm Animal & Poultry Supplies", "Dog & Cat Food", "Dog & Cat Furniture",
+        "Dog & Cat Clothing", "Dog & Cat Litter", "Dog & Cat Grooming"
+    ],
+    "Computers & Office Equipment": [
+        "Desktop Computers, Laptops & Tablets", "Desktop & Laptop Components",
+        "Computer Accessories", "Data Storage & Software", "Network Components",
+        "Office Equipment", "Office Stationery & Supplies"
+    ],
+    "Automotive & Motorcycle": [
+        "Car Electronics", "Car Exterior Accessories", "Car Interior Accessories",
+        "Car Repair Tools", "Car Lights", "Quads, Motorhomes & Boats",
+        "Car Washing & Maintenance", "Motorcycle Accessories"
+    ],
+    "Home Improvement": [
+        "Electrical Equipment & Supplies", "Kitchen Fixtures", "Smart Home Systems",
+        "Building Supplies", "Bathroom Fixtures", "Security & Safety", "Garden Supplies",
+        "Solar & Wind Power", "Lights & Lighting"
+    ],
+    "Tools & Hardware": [
+        "Power Tools", "Hand Tools", "Measuring Tools", "Garden Tools", "Soldering Equipment",
+        "Tool Organizers", "Hardware", "Pumps & Plumbing"
+    ],
+    "Furniture": [
+        "Indoor Furniture", "Outdoor Furniture", "Commercial Furniture"
+    ],
+    "Toys & Hobbies": [
+        "Educational Toys", "Sports & Outdoor Play", "Electric & Remote Control Toys",
+        "Games & Puzzles", "Classic & Novelty Toys", "Musical Instruments & Accessories", "DIY"
+    ],
+    "Collectibles": [
+        "Contemporary Culture Collectibles", "Trading Cards & Accessories",
+        "Sports Collectibles", "Entertainment"
+    ],
+    "Jewelry Accessories & Derivatives": [
+        "Non-natural Crystal", "Jade", "Semiprecious Stones", "Artificial Gemstones", "Pearl",
+        "Amber", "Mellite", "Platinum & Carat Gold", "Silver", "Natural Crystal"
+    ],
+    "Luggage & Bags": [
+        "Women's Bags", "Men's Bags", "Luggage & Travel Bags", "Functional Bags", "Bag Accessories"
+    ],
+    "Menswear & Underwear": [
+        "Men's Tops", "Men's Bottoms", "Men's Special Clothing", "Men's Underwear",
+        "Men's Sleepwear & Loungewear", "Men's Suits & Overalls"
+    ],
+    "Books, Magazines & Audio": [
+        "Literature & Art", "Economics & Management", "Children's & Infants' Books",
+        "Science & Technology", "Lifestyle & Hobbies", "Education & Schooling",
+        "Humanities & Social Sciences", "Magazines & Newspapers", "Video & Music"
+    ],
+    "Health": [
+        "Food Supplements", "Medical Supplies", "Alternative Medications & Treatments"
+    ],
+    "Food & Beverages": [
+        "Milk & Dairy", "Drinks", "Instant Food", "Staples & Cooking Essentials", "Baking", "Snacks"
+    ],
+    "Fashion Accessories": [
+        "Hair Extensions & Wigs", "Dressmaking Fabrics", "Clothes Accessories", "Eyewear",
+        "Watches & Accessories", "Costume Jewelry & Accessories", "Hair Accessories"
+    ]
+}
+
+CATEGORY_COLUMNS = ['main_category', 'detailed_category']
+RESULT_COLUMNS = ['tt_handles', 'main_category', 'detailed_category',
+                  'matched_main_category', 'matched_detailed_category']
+
+
+def merge_category_fields(df: pd.DataFrame) -> pd.Series:
+    """Combine main and detailed category into the single string that gets matched."""
+    return df['main_category'].fillna('') + ', ' + df['detailed_category'].fillna('')
+
+
+def matcher_fingerprint(category_mapping: Dict[str, List[str]], threshold: float, max_main: int,
+                        max_detailed: int, backend: str = 'tfidf', model_name: Optional[str] = None) -> str:
+    """Hash of every setting that changes a row's matches, used to invalidate stored results."""
+    settings = {'taxonomy': category_mapping, 'threshold': threshold, 'max_main': max_main,
+                'max_detailed': max_detailed, 'backend': backend, 'model': model_name}
+    return hashlib.md5(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class BaseCategoryMatcher:
+    """
+    Shared interface for matchers that map category strings onto the taxonomy.
+
+    Subclasses implement top_k(); thresholding, comma-joining and the result
+    frame layout are common to every backend.
+    """
+
+    backend = None
+
+    def __init__(self, category_mapping: Dict[str, List[str]] = CATEGORY_MAPPING,
+                 threshold: float = 0.3, max_main: int = 5, max_detailed: int = 6):
+        """
+        Args:
+            category_mapping: Main category -> list of detailed categories
+            threshold: Minimum similarity for a label to count as a match
+            max_main: Maximum number of main categories returned per row
+            max_detailed: Maximum number of detailed categories returned per row
+        """
+        self.category_mapping = category_mapping
+        self.threshold = threshold
+        self.max_main = max_main
+        self.max_detailed = max_detailed
+        self.main_labels = list(category_mapping.keys())
+        self.detailed_labels = [item for sublist in category_mapping.values() for item in sublist]
+
+    def fingerprint(self) -> str:
+        """matcher_fingerprint of this matcher's taxonomy, threshold, limits, backend and model."""
+        return matcher_fingerprint(self.category_mapping, self.threshold, self.max_main, self.max_detailed,
+                                   self.backend, getattr(self, 'model_name', None))
+
+    def top_k(self, merged_categories: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Score merged category strings against both label sets without applying the threshold.
+
+        Args:
+            merged_categories: "main, detailed" strings, one per row
+
+        Returns:
+            {'main': (indices, scores), 'detailed': (indices, scores)}, each array shaped (rows, k)
+            with the best label first
+        """
+        raise NotImplementedError
+
+    def _join_matches(self, top_indices: np.ndarray, top_scores: np.ndarray, labels: List[str]) -> List[str]:
+        """Comma-join the labels that clear the threshold, best first."""
+        return [', '.join(labels[i] for i, s in zip(indices, scores) if s >= self.threshold)
+                for indices, scores in zip(top_indices, top_scores)]
+
+    def match(self, merged_categories: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Match merged category strings to main and detailed taxonomy labels.
+
+        Args:
+            merged_categories: "main, detailed" strings, one per row
+
+        Returns:
+            Tuple of (matched main categories, matched detailed categories), comma-joined per row
+        """
+        top = self.top_k(merged_categories)
+        return (self._join_matches(*top['main'], self.main_labels),
+                self._join_matches(*top['detailed'], self.detailed_labels))
+
+    def match_frame(self, df: pd.DataFrame, include_scores: bool = False) -> pd.DataFrame:
+        """
+        Build the matched_categories_results frame for a masterpool slice.
+
+        Args:
+            df: Frame with tt_handles, main_category and detailed_category columns
+            include_scores: Also add main_match_i/main_score_i and detailed_match_i/detailed_score_i
+                columns for the top-k labels, regardless of the threshold; the label is blank
+                where the score is not positive
+
+        Returns:
+            Frame with RESULT_COLUMNS, followed by the score columns if requested
+        """
+        df = df[['tt_handles'] + CATEGORY_COLUMNS].fillna('')
+        top = self.top_k(merge_category_fields(df).tolist())
+        result_df = df.reset_index(drop=True)
+        result_df['matched_main_category'] = self._join_matches(*top['main'], self.main_labels)
+        result_df['matched_detailed_category'] = self._join_matches(*top['detailed'], self.detailed_labels)
+        if not include_scores:
+            return result_df[RESULT_COLUMNS]
+
+        score_columns = {}
+        for level, labels in (('main', self.main_labels), ('detailed', self.detailed_labels)):
+            top_indices, top_scores = top[level]
+            label_array = np.array(labels, dtype=object)
+            for rank in range(top_indices.shape[1]):
+                # A label with no similarity at all is not a candidate, just the first index of a tie
+                score_columns[f'{level}_match_{rank + 1}'] = np.where(top_scores[:, rank] > 0,
+                                                                      label_array[top_indices[:, rank]], '')
+                score_columns[f'{level}_score_{rank + 1}'] = top_scores[:, rank].astype('float32')
+        return pd.concat([result_df[RESULT_COLUMNS], pd.DataFrame(score_columns)], axis=1)
+
+
+class CategoryMatcher(BaseCategoryMatcher):
+    """
+    Maps free-text category strings onto the TikTok taxonomy with TF-IDF cosine similarity.
+
+    The vectorizers are fit on the taxonomy labels only, so a row's matches depend
+    on nothing but its own text. That is what makes incremental re-matching valid.
+    """
+
+    backend = 'tfidf'
+
+    def __init__(self, category_mapping: Dict[str, List[str]] = CATEGORY_MAPPING,
+                 threshold: float = 0.3, max_main: int = 5, max_detailed: int = 6):
+        """Initialize the matcher and vectorize the taxonomy labels once."""
+        super().__init__(category_mapping, threshold, max_main, max_detailed)
+        self.main_vectorizer = TfidfVectorizer().fit(self.main_labels)
+        self.detailed_vectorizer = TfidfVectorizer().fit(self.detailed_labels)
+        self.main_vectors = self.main_vectorizer.transform(self.main_labels)
+        self.detailed_vectors = self.detailed_vectorizer.transform(self.detailed_labels)
+
+    def _top_k(self, texts: List[str], vectorizer: TfidfVectorizer, label_vectors,
+               n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Score all texts against the labels in one sparse product and keep the top n per row."""
+        n = min(n, label_vectors.shape[0])
+        if not texts:
+            return np.empty((0, n), dtype=int), np.empty((0, n))
+        # TF-IDF rows are L2-normalized, so the dot product is the cosine similarity
+        similarities = (vectorizer.transform(texts) @ label_vectors.T).toarray()
+        top_indices = np.argsort(-similarities, axis=1, kind='stable')[:, :n]
+        return top_indices, np.take_along_axis(similarities, top_indices, axis=1)
+
+    def top_k(self, merged_categories: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        return {
+            'main': self._top_k(merged_categories, self.main_vectorizer, self.main_vectors, self.max_main),
+            'detailed': self._top_k(merged_categories, self.detailed_vectorizer, self.detailed_vectors,
+                                    self.max_detailed),
+        }
+
+
+def score_columns(df: pd.DataFrame) -> List[str]:
+    """Names of the top-k label/score columns added by match_frame(include_scores=True)."""
+    return [c for c in df.columns if c.startswith(('main_match_', 'main_score_',
+                                                   'detailed_match_', 'detailed_score_'))]
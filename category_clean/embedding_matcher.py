@@ -0,0 +1,132 @@
+import os
+import hashlib
+import logging
+import numpy as np
+from typing import List, Dict, Tuple, Optional
+
+from category_matcher import BaseCategoryMatcher, CATEGORY_MAPPING
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+def top_k_dense(similarities: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top n columns per row of a dense score matrix, best first, via argpartition."""
+    n = min(n, similarities.shape[1])
+    if similarities.shape[0] == 0:
+        return np.empty((0, n), dtype=int), np.empty((0, n), dtype=similarities.dtype)
+    if n < similarities.shape[1]:
+        candidates = np.argpartition(-similarities, n - 1, axis=1)[:, :n]
+    else:
+        candidates = np.tile(np.arange(n), (similarities.shape[0], 1))
+    candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class EmbeddingCategoryMatcher(BaseCategoryMatcher):
+    """
+    Dense-embedding counterpart of CategoryMatcher, backed by a local sentence-embedding model.
+
+    Taxonomy label vectors are embedded once and cached on disk per model and
+    taxonomy. Masterpool strings are embedded in batches and cached per unique
+    raw string, so the model only runs on strings it has not seen before.
+    Requires the optional sentence-transformers package.
+    """
+
+    backend = 'embedding'
+
+    def __init__(self, category_mapping: Dict[str, List[str]] = CATEGORY_MAPPING,
+                 threshold: float = 0.5, max_main: int = 5, max_detailed: int = 6,
+                 model_name: str = DEFAULT_MODEL, cache_dir: Optional[str] = None,
+                 batch_size: int = 256):
+        """
+        Load the model on CPU and embed (or load cached) taxonomy label vectors.
+
+        Args:
+            category_mapping: Main category -> list of detailed categories
+            threshold: Minimum cosine similarity for a label to count as a match
+            max_main: Maximum number of main categories returned per row
+            max_detailed: Maximum number of detailed categories returned per row
+            model_name: Sentence-transformers model name or local path
+            cache_dir: Directory for label and string embedding caches; None disables disk caching
+            batch_size: Strings per model forward pass
+        """
+        super().__init__(category_mapping, threshold, max_main, max_detailed)
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("The embedding backend needs sentence-transformers: pip install sentence-transformers")
+
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device='cpu')
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.main_vectors = self._label_vectors(self.main_labels)
+        self.detailed_vectors = self._label_vectors(self.detailed_labels)
+        self._string_cache: Dict[str, np.ndarray] = {}
+        self._load_string_cache()
+
+    def _cache_path(self, name: str) -> str:
+        model_key = hashlib.md5(self.model_name.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f'{name}_{model_key}.npz')
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with the model, L2-normalized so dot products are cosine similarities."""
+        vectors = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return vectors.astype('float32')
+
+    def _label_vectors(self, labels: List[str]) -> np.ndarray:
+        """Embed a label set once, reusing the on-disk copy when the labels are unchanged."""
+        if not self.cache_dir:
+            return self._embed(labels)
+        labels_key = hashlib.md5('\x1f'.join(labels).encode('utf-8')).hexdigest()[:12]
+        path = self._cache_path(f'labels_{labels_key}')
+        if os.path.exists(path):
+            return np.load(path)['vectors']
+        vectors = self._embed(labels)
+        np.savez(path, vectors=vectors)
+        return vectors
+
+    def _load_string_cache(self):
+        if not self.cache_dir or not os.path.exists(self._cache_path('strings')):
+            return
+        cached = np.load(self._cache_path('strings'), allow_pickle=False)
+        self._string_cache = dict(zip(cached['strings'].tolist(), cached['vectors']))
+        logger.info(f"Loaded {len(self._string_cache)} cached string embeddings")
+
+    def save_cache(self):
+        """Persist the per-string embedding cache; call once after matching, from a single process."""
+        if not self.cache_dir or not self._string_cache:
+            return
+        strings = list(self._string_cache.keys())
+        np.savez(self._cache_path('strings'), strings=np.array(strings, dtype=str),
+                 vectors=np.stack([self._string_cache[s] for s in strings]))
+
+    def embed_strings(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, running the model only on unique strings missing from the cache."""
+        missing = [t for t in dict.fromkeys(texts) if t not in self._string_cache]
+        if missing:
+            logger.info(f"Embedding {len(missing)} new strings ({len(texts)} rows)")
+            self._string_cache.update(zip(missing, self._embed(missing)))
+        dimension = self.main_vectors.shape[1]
+        if not texts:
+            return np.empty((0, dimension), dtype='float32')
+        return np.stack([self._string_cache[t] for t in texts])
+
+    def top_k(self, merged_categories: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        vectors = self.embed_strings(merged_categories)
+        # Rows with no category text score zero, as they do under TF-IDF
+        blank = np.array([not text.strip(' ,') for text in merged_categories], dtype=bool)
+        if blank.any():
+            vectors = vectors.copy()
+            vectors[blank] = 0
+        return {
+            'main': top_k_dense(vectors @ self.main_vectors.T, self.max_main),
+            'detailed': top_k_dense(vectors @ self.detailed_vectors.T, self.max_detailed),
+        }
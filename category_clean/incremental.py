@@ -0,0 +1,149 @@
+import os
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from typing import Optional
+
+from category_matcher import (BaseCategoryMatcher, CATEGORY_MAPPING, CATEGORY_COLUMNS, RESULT_COLUMNS,
+                              matcher_fingerprint)
+from pipeline import KEY_COLUMN, DEFAULT_THRESHOLDS, read_table, write_table, load_taxonomy, build_matcher
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_COLUMN = 'category_hash'
+# Settings the notebook matched with, assumed for stored results that carry no hash
+NOTEBOOK_FINGERPRINT = matcher_fingerprint(CATEGORY_MAPPING, DEFAULT_THRESHOLDS['tfidf'], 5, 6)
+
+
+def category_hash(df: pd.DataFrame, fingerprint: str = NOTEBOOK_FINGERPRINT) -> pd.Series:
+    """
+    Stable per-row hash of the category fields and the matcher fingerprint.
+
+    Editing a row changes its hash; changing the taxonomy, threshold, limits or
+    backend changes every hash, so the next run re-matches all rows.
+    """
+    fields = df[CATEGORY_COLUMNS].fillna('')
+    return pd.Series(
+        [hashlib.md5('\x1f'.join(values + (fingerprint,)).encode('utf-8')).hexdigest()
+         for values in fields.itertuples(index=False, name=None)],
+        index=df.index
+    )
+
+
+def load_masterpool(masterpool_path: str) -> pd.DataFrame:
+    """Read only the key and category columns of the masterpool, one row per handle."""
+    df = read_table(masterpool_path, columns=[KEY_COLUMN] + CATEGORY_COLUMNS)
+    duplicates = df[KEY_COLUMN].duplicated(keep='last')
+    if duplicates.any():
+        logger.warning(f"{duplicates.sum()} duplicate {KEY_COLUMN} rows in masterpool, keeping the last occurrence")
+        df = df[~duplicates]
+    return df.reset_index(drop=True)
+
+
+def load_results(results_path: str) -> pd.DataFrame:
+    """Read the stored results, or an empty frame if this is the first run."""
+    if not os.path.exists(results_path):
+        return pd.DataFrame(columns=RESULT_COLUMNS + [HASH_COLUMN])
+    results_df = read_table(results_path)
+    if HASH_COLUMN not in results_df.columns:
+        # Results written by the notebook carry no hash; recompute it from the stored fields
+        results_df[HASH_COLUMN] = category_hash(results_df)
+    return results_df
+
+
+def find_changed_rows(masterpool_df: pd.DataFrame, results_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return masterpool rows that are new, edited, or were matched under different settings.
+
+    Args:
+        masterpool_df: Current masterpool with a category_hash column
+        results_df: Previously stored results with a category_hash column
+
+    Returns:
+        Subset of masterpool_df that needs to be (re)matched
+    """
+    stored_hashes = results_df.drop_duplicates(KEY_COLUMN, keep='last').set_index(KEY_COLUMN)[HASH_COLUMN]
+    previous = masterpool_df[KEY_COLUMN].map(stored_hashes)
+    return masterpool_df[previous != masterpool_df[HASH_COLUMN]]
+
+
+def update_matched_categories(masterpool_path: str, results_path: str,
+                              matcher: Optional[BaseCategoryMatcher] = None,
+                              drop_removed: bool = True) -> pd.DataFrame:
+    """
+    Incrementally re-categorize the masterpool and upsert the delta into the stored results.
+
+    Args:
+        masterpool_path: Path to the masterpool (.csv or .parquet)
+        results_path: Path to matched_categories_results (.csv or .parquet, created on first run)
+        matcher: Matcher to use (TF-IDF or embedding); a default TF-IDF one is built if omitted.
+            Rows stored under a different matcher fingerprint are re-matched
+        drop_removed: Remove stored handles that no longer exist in the masterpool
+
+    Returns:
+        The updated results frame, as written to results_path
+    """
+    matcher = matcher or build_matcher(CATEGORY_MAPPING)
+    masterpool_df = load_masterpool(masterpool_path)
+    masterpool_df[HASH_COLUMN] = category_hash(masterpool_df, matcher.fingerprint())
+    results_df = load_results(results_path)
+
+    changed_df = find_changed_rows(masterpool_df, results_df)
+    logger.info(f"{len(changed_df)} of {len(masterpool_df)} rows are new or changed")
+
+    if drop_removed:
+        removed = ~results_df[KEY_COLUMN].isin(masterpool_df[KEY_COLUMN])
+        if removed.any():
+            logger.info(f"Dropping {removed.sum()} handles no longer in the masterpool")
+            results_df = results_df[~removed]
+
+    if len(changed_df) == 0 and not drop_removed:
+        return results_df
+
+    if len(changed_df) > 0:
+        matched_df = matcher.match_frame(changed_df)
+        matched_df[HASH_COLUMN] = changed_df[HASH_COLUMN].values
+        if hasattr(matcher, 'save_cache'):
+            matcher.save_cache()
+
+        # Upsert: replace stored rows for the changed handles and append new ones
+        results_df = results_df[~results_df[KEY_COLUMN].isin(matched_df[KEY_COLUMN])]
+        results_df = pd.concat([results_df, matched_df], ignore_index=True)
+
+    # Keep the masterpool's row order so the output diffs cleanly between runs
+    order = pd.Series(range(len(masterpool_df)), index=masterpool_df[KEY_COLUMN])
+    results_df = results_df.assign(_order=results_df[KEY_COLUMN].map(order))
+    results_df = results_df.sort_values('_order', kind='stable').drop(columns='_order')
+    results_df = results_df[RESULT_COLUMNS + [HASH_COLUMN]].reset_index(drop=True)
+
+    write_table(results_df, results_path)
+    logger.info(f"Results saved to {results_path}")
+    return results_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally re-categorize new or changed masterpool rows.")
+    parser.add_argument('masterpool', help="Path to string_masterpool_updated.csv")
+    parser.add_argument('results', help="Path to matched_categories_results.csv")
+    parser.add_argument('--taxonomy', help="JSON taxonomy file; defaults to the built-in TikTok taxonomy")
+    parser.add_argument('--backend', choices=sorted(DEFAULT_THRESHOLDS), default='tfidf',
+                        help="Similarity backend: TF-IDF cosine or a local sentence-embedding model")
+    parser.add_argument('--model', help="Sentence-embedding model name or path for --backend embedding")
+    parser.add_argument('--cache-dir', help="Directory for cached label and string embeddings")
+    parser.add_argument('--threshold', type=float,
+                        help="Minimum similarity for a match (default: 0.3 for tfidf, 0.5 for embedding)")
+    parser.add_argument('--max-main', type=int, default=5, help="Maximum main categories per row")
+    parser.add_argument('--max-detailed', type=int, default=6, help="Maximum detailed categories per row")
+    parser.add_argument('--keep-removed', action='store_true',
+                        help="Keep stored rows whose handle is no longer in the masterpool")
+    args = parser.parse_args()
+
+    matcher = build_matcher(load_taxonomy(args.taxonomy), args.backend, args.threshold, args.max_main,
+                            args.max_detailed, args.model, args.cache_dir)
+    update_matched_categories(args.masterpool, args.results, matcher, drop_removed=not args.keep_removed)
+
+
+if __name__ == "__main__":
+    main()
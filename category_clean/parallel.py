@@ -0,0 +1,150 @@
+import os
+import logging
+import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Optional
+
+from category_matcher import BaseCategoryMatcher, CATEGORY_COLUMNS
+from pipeline import KEY_COLUMN, table_format, load_taxonomy, add_matches, build_matcher
+
+logger = logging.getLogger(__name__)
+
+# Built once per worker process by _init_worker and reused for every chunk it scores
+_worker_matcher: Optional[BaseCategoryMatcher] = None
+_worker_include_scores = False
+
+
+def _init_worker(matcher_kwargs: Dict, include_scores: bool):
+    """Vectorize the taxonomy once per worker so chunks only carry their own rows."""
+    global _worker_matcher, _worker_include_scores
+    _worker_matcher = build_matcher(**matcher_kwargs)
+    _worker_include_scores = include_scores
+
+
+def _match_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Score one chunk in a worker and return it with the matched columns added."""
+    return add_matches(chunk, _worker_matcher, _worker_include_scores)
+
+
+def iter_chunks(path: str, chunk_size: int, columns: Optional[List[str]] = None,
+                fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or Parquet table in blocks of at most chunk_size rows.
+
+    Args:
+        path: Input file
+        chunk_size: Rows per block
+        columns: Optional subset of columns to read
+        fmt: Force 'csv' or 'parquet'
+
+    Yields:
+        DataFrame blocks with key and category columns as blank-filled strings. CSV
+        columns are all read as strings, as in read_table, so every block has the
+        same dtypes whatever values it happens to contain.
+    """
+    if table_format(path, fmt) == 'parquet':
+        import pyarrow.parquet as pq
+        reader = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns))
+    else:
+        reader = pd.read_csv(path, usecols=columns, dtype=str, chunksize=chunk_size)
+    for chunk in reader:
+        for column in [KEY_COLUMN] + CATEGORY_COLUMNS:
+            if column in chunk.columns:
+                chunk[column] = chunk[column].fillna('').astype(str)
+        yield chunk
+
+
+class _ChunkWriter:
+    """Appends ordered chunks to a CSV or Parquet output file."""
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.format = table_format(path, fmt)
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                # A column that is empty in the first chunk has no type yet; later chunks hold text
+                schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                                    for f in table.schema], metadata=table.schema.metadata)
+                self._parquet_writer = pq.ParquetWriter(self.path, schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def run_chunked(input_path: str, output_path: str, taxonomy_path: Optional[str] = None,
+                threshold: Optional[float] = None, max_main: int = 5, max_detailed: int = 6,
+                merge: bool = True, chunk_size: int = 50000, workers: Optional[int] = None,
+                include_scores: bool = False, backend: str = 'tfidf', model_name: Optional[str] = None,
+                cache_dir: Optional[str] = None, input_format: Optional[str] = None,
+                output_format: Optional[str] = None) -> int:
+    """
+    Match a large table in streamed chunks across a process pool.
+
+    At most 2 * workers chunks are in flight at once, so memory stays bounded by
+    the chunk size rather than the table size. Chunks are written in input order
+    as soon as each one and all chunks before it have completed. With the
+    embedding backend, workers read the string cache but never write it.
+
+    Args:
+        input_path: Input CSV or Parquet file
+        output_path: Output CSV or Parquet file
+        taxonomy_path: Optional JSON taxonomy file
+        threshold: Minimum similarity for a match; None uses the backend default
+        max_main: Maximum main categories per row
+        max_detailed: Maximum detailed categories per row
+        merge: Carry all input columns through; otherwise only key and category columns are read
+        chunk_size: Rows per chunk
+        workers: Number of worker processes (defaults to the CPU count)
+        include_scores: Add numeric top-k label/score columns to the output
+        backend: 'tfidf' or 'embedding'
+        model_name: Sentence-embedding model for the embedding backend
+        cache_dir: Embedding cache directory for the embedding backend
+        input_format: Force 'csv' or 'parquet' for the input
+        output_format: Force 'csv' or 'parquet' for the output
+
+    Returns:
+        Total number of rows written
+    """
+    workers = workers or os.cpu_count() or 1
+    columns = None if merge else [KEY_COLUMN] + CATEGORY_COLUMNS
+    matcher_kwargs = dict(taxonomy=load_taxonomy(taxonomy_path), backend=backend, threshold=threshold,
+                          max_main=max_main, max_detailed=max_detailed, model_name=model_name,
+                          cache_dir=cache_dir)
+    writer = _ChunkWriter(output_path, output_format)
+    total_rows = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(matcher_kwargs, include_scores)) as executor:
+        pending = deque()
+        try:
+            for chunk in iter_chunks(input_path, chunk_size, columns=columns, fmt=input_format):
+                pending.append(executor.submit(_match_chunk, chunk))
+                # Block on the oldest chunk once the window is full to keep memory bounded
+                while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    total_rows += len(result)
+            while pending:
+                result = pending.popleft().result()
+                writer.write(result)
+                total_rows += len(result)
+        finally:
+            writer.close()
+
+    logger.info(f"Matched {total_rows} rows in chunks of {chunk_size} across {workers} workers")
+    logger.info(f"Results saved to {output_path}")
+    return total_rows
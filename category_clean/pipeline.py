@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import logging
+import argparse
+import pandas as pd
+from typing import List, Dict, Optional
+
+from category_matcher import BaseCategoryMatcher, CategoryMatcher, CATEGORY_MAPPING, CATEGORY_COLUMNS, score_columns
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = 'tt_handles'
+MATCHED_COLUMNS = ['matched_main_category', 'matched_detailed_category']
+# Top-k score columns written by match_frame(include_scores=True), the only numeric CSV columns
+SCORE_PREFIXES = ('main_score_', 'detailed_score_')
+# Default similarity threshold per backend; embedding cosines run higher than TF-IDF ones
+DEFAULT_THRESHOLDS = {'tfidf': 0.3, 'embedding': 0.5}
+
+
+def table_format(path: str, fmt: Optional[str] = None) -> str:
+    """Resolve 'csv' or 'parquet' from an explicit format or the file extension."""
+    if fmt:
+        return fmt
+    return 'parquet' if os.path.splitext(path)[1].lower() in ('.parquet', '.pq') else 'csv'
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a CSV or Parquet table, optionally restricted to the given columns.
+
+    CSV columns are read as strings, as the notebook loaded the masterpool, so
+    passthrough columns such as phone numbers are written back unchanged; only
+    top-k score columns are parsed as numbers. Category and key columns have
+    missing values blanked.
+    """
+    if table_format(path, fmt) == 'parquet':
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns, dtype=str)
+        for column in df.columns:
+            if column.startswith(SCORE_PREFIXES):
+                df[column] = pd.to_numeric(df[column])
+    for column in [KEY_COLUMN] + CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].fillna('').astype(str)
+    return df
+
+
+def write_table(df: pd.DataFrame, path: str, fmt: Optional[str] = None):
+    """Write a frame as CSV or Parquet."""
+    if table_format(path, fmt) == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def load_taxonomy(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Load a main -> detailed category taxonomy from a JSON file.
+
+    Args:
+        path: JSON file shaped like {"Main Category": ["Detailed", ...]}; None uses the built-in taxonomy
+
+    Returns:
+        The taxonomy mapping
+    """
+    if path is None:
+        return CATEGORY_MAPPING
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    if not isinstance(taxonomy, dict) or not all(isinstance(v, list) for v in taxonomy.values()):
+        raise ValueError(f"Taxonomy file {path} must map each main category to a list of detailed categories")
+    return taxonomy
+
+
+def build_matcher(taxonomy: Dict[str, List[str]], backend: str = 'tfidf', threshold: Optional[float] = None,
+                  max_main: int = 5, max_detailed: int = 6, model_name: Optional[str] = None,
+                  cache_dir: Optional[str] = None) -> BaseCategoryMatcher:
+    """
+    Build the matcher for a backend.
+
+    Args:
+        taxonomy: Main category -> list of detailed categories
+        backend: 'tfidf' or 'embedding'
+        threshold: Minimum similarity for a match; None uses the backend default
+        max_main: Maximum main categories per row
+        max_detailed: Maximum detailed categories per row
+        model_name: Sentence-embedding model for the embedding backend
+        cache_dir: Embedding cache directory for the embedding backend
+
+    Returns:
+        A matcher exposing top_k/match/match_frame
+    """
+    if backend not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unknown matcher backend: {backend}")
+    threshold = DEFAULT_THRESHOLDS[backend] if threshold is None else threshold
+    if backend == 'embedding':
+        # Imported lazily so the TF-IDF path does not need sentence-transformers
+        from embedding_matcher import EmbeddingCategoryMatcher, DEFAULT_MODEL
+        return EmbeddingCategoryMatcher(taxonomy, threshold=threshold, max_main=max_main,
+                                        max_detailed=max_detailed, model_name=model_name or DEFAULT_MODEL,
+                                        cache_dir=cache_dir)
+    return CategoryMatcher(taxonomy, threshold=threshold, max_main=max_main, max_detailed=max_detailed)
+
+
+def run_pipeline(input_path: str, output_path: str, taxonomy_path: Optional[str] = None,
+                 threshold: Optional[float] = None, max_main: int = 5, max_detailed: int = 6,
+                 merge: bool = True, input_format: Optional[str] = None,
+                 output_format: Optional[str] = None, include_scores: bool = False,
+                 report_path: Optional[str] = None, labels_path: Optional[str] = None,
+                 target_precision: float = 0.9, backend: str = 'tfidf',
+                 model_name: Optional[str] = None, cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Match masterpool categories to the taxonomy and write the result in one pass.
+
+    Args:
+        input_path: Masterpool CSV or Parquet file
+        output_path: Where to write the result
+        taxonomy_path: Optional JSON taxonomy file
+        threshold: Minimum similarity for a match; None uses the backend default
+        max_main: Maximum main categories per row
+        max_detailed: Maximum detailed categories per row
+        merge: Write the full masterpool with matched columns added; otherwise only
+            the key, category and matched columns are read and written
+        input_format: Force 'csv' or 'parquet' for the input
+        output_format: Force 'csv' or 'parquet' for the output
+        include_scores: Add numeric top-k label/score columns to the output
+        report_path: Write a match-quality and throughput report here (implies include_scores)
+        labels_path: Labeled sample used to calibrate thresholds in the report
+        target_precision: Precision target for threshold calibration
+        backend: 'tfidf' or 'embedding'
+        model_name: Sentence-embedding model for the embedding backend
+        cache_dir: Embedding cache directory for the embedding backend
+
+    Returns:
+        The frame that was written
+    """
+    started = time.perf_counter()
+    include_scores = include_scores or report_path is not None
+    columns = None if merge else [KEY_COLUMN] + CATEGORY_COLUMNS
+    df = read_table(input_path, columns=columns, fmt=input_format)
+    logger.info(f"Loaded {len(df)} rows from {input_path}")
+
+    matcher = build_matcher(load_taxonomy(taxonomy_path), backend, threshold, max_main, max_detailed,
+                            model_name, cache_dir)
+    df = add_matches(df, matcher, include_scores)
+    if hasattr(matcher, 'save_cache'):
+        matcher.save_cache()
+
+    write_table(df, output_path, fmt=output_format)
+    logger.info(f"Results saved to {output_path}")
+
+    if report_path:
+        from report import build_report, peak_memory_mb
+        run_stats = {'rows': len(df), 'seconds': time.perf_counter() - started,
+                     'peak_memory_mb': peak_memory_mb()}
+        labels_df = read_table(labels_path) if labels_path else None
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(build_report(df, matcher.threshold, labels_df, target_precision, run_stats))
+        logger.info(f"Report saved to {report_path}")
+    return df
+
+
+def add_matches(df: pd.DataFrame, matcher: BaseCategoryMatcher, include_scores: bool = False) -> pd.DataFrame:
+    """Return df with its matched (and optionally top-k score) columns replaced by fresh matches."""
+    matched_df = matcher.match_frame(df, include_scores=include_scores)
+    new_columns = MATCHED_COLUMNS + score_columns(matched_df)
+    df = df.drop(columns=[c for c in new_columns if c in df.columns]).reset_index(drop=True)
+    return pd.concat([df, matched_df[new_columns]], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map masterpool categories onto the TikTok taxonomy.")
+    parser.add_argument('input', help="Masterpool file (.csv or .parquet)")
+    parser.add_argument('output', help="Output file (.csv or .parquet)")
+    parser.add_argument('--taxonomy', help="JSON taxonomy file; defaults to the built-in TikTok taxonomy")
+    parser.add_argument('--backend', choices=sorted(DEFAULT_THRESHOLDS), default='tfidf',
+                        help="Similarity backend: TF-IDF cosine or a local sentence-embedding model")
+    parser.add_argument('--model', help="Sentence-embedding model name or path for --backend embedding")
+    parser.add_argument('--cache-dir', help="Directory for cached label and string embeddings")
+    parser.add_argument('--threshold', type=float,
+                        help="Minimum similarity for a match (default: 0.3 for tfidf, 0.5 for embedding)")
+    parser.add_argument('--max-main', type=int, default=5, help="Maximum main categories per row")
+    parser.add_argument('--max-detailed', type=int, default=6, help="Maximum detailed categories per row")
+    parser.add_argument('--matches-only', action='store_true',
+                        help="Write only key, category and matched columns instead of the merged masterpool")
+    parser.add_argument('--input-format', choices=['csv', 'parquet'])
+    parser.add_argument('--output-format', choices=['csv', 'parquet'])
+    parser.add_argument('--scores', action='store_true', help="Add numeric top-k label/score columns")
+    parser.add_argument('--report', help="Write a match-quality and throughput report to this path")
+    parser.add_argument('--labels', help="Labeled sample (tt_handles, true_main_category, true_detailed_category)")
+    parser.add_argument('--target-precision', type=float, default=0.9,
+                        help="Precision target for threshold calibration in the report")
+    parser.add_argument('--chunk-size', type=int,
+                        help="Stream the input in chunks of this many rows and score them in a process pool")
+    parser.add_argument('--workers', type=int, help="Worker processes for chunked mode (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.chunk_size:
+        if args.report:
+            parser.error("--report needs the full result in memory; run report.py on the chunked output instead")
+        # Imported here because parallel.py builds on this module's readers
+        from parallel import run_chunked
+        run_chunked(args.input, args.output, taxonomy_path=args.taxonomy, threshold=args.threshold,
+                    max_main=args.max_main, max_detailed=args.max_detailed, merge=not args.matches_only,
+                    chunk_size=args.chunk_size, workers=args.workers, include_scores=args.scores,
+                    backend=args.backend, model_name=args.model, cache_dir=args.cache_dir,
+                    input_format=args.input_format, output_format=args.output_format)
+        return
+
+    run_pipeline(args.input, args.output, taxonomy_path=args.taxonomy, threshold=args.threshold,
+                 max_main=args.max_main, max_detailed=args.max_detailed, merge=not args.matches_only,
+                 input_format=args.input_format, output_format=args.output_format,
+                 include_scores=args.scores, report_path=args.report, labels_path=args.labels,
+                 target_precision=args.target_precision, backend=args.backend, model_name=args.model,
+                 cache_dir=args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import sys
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional
+
+from pipeline import KEY_COLUMN, read_table
+
+logger = logging.getLogger(__name__)
+
+# Group label for rows whose best main category has zero similarity
+NO_CANDIDATE = '(no candidate)'
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process in MB, or NaN where the resource module is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def score_distribution(result_df: pd.DataFrame, level: str = 'main') -> pd.Series:
+    """Summary statistics of the top-1 similarity score for the 'main' or 'detailed' level."""
+    scores = result_df[f'{level}_score_1'].astype(float)
+    return scores.describe(percentiles=[0.1, 0.25, 0.5, 0.75, 0.9]).round(4)
+
+
+def match_rates_by_main_category(result_df: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """
+    Match/no-match rates grouped by each row's best main category candidate.
+
+    Rows are grouped by main_match_1 even when it falls below the threshold, so a
+    category whose rows mostly miss shows up with a high no-match rate. Rows with
+    no similar label at all (blank main_match_1) form their own NO_CANDIDATE group.
+    """
+    matched = result_df['main_score_1'].astype(float) >= threshold
+    candidates = result_df['main_match_1'].fillna('').replace('', NO_CANDIDATE)
+    rates = matched.groupby(candidates).agg(['size', 'mean'])
+    rates.columns = ['rows', 'match_rate']
+    rates['no_match_rate'] = 1 - rates['match_rate']
+    return rates.sort_values('rows', ascending=False).round(4)
+
+
+def calibrate_threshold(result_df: pd.DataFrame, labels_df: pd.DataFrame, target_precision: float,
+                        level: str = 'main') -> Dict:
+    """
+    Find the lowest top-1 score threshold whose precision on a labeled sample reaches the target.
+
+    Args:
+        result_df: Matcher output with {level}_match_1 and {level}_score_1 columns
+        labels_df: Labeled sample with tt_handles and true_{level}_category columns
+        target_precision: Desired precision of accepted top-1 matches, between 0 and 1
+        level: 'main' or 'detailed'
+
+    Returns:
+        Dictionary with the threshold (None if unreachable), its precision and coverage,
+        and the number of labeled rows used
+    """
+    label_column = f'true_{level}_category'
+    sample = result_df[[KEY_COLUMN, f'{level}_match_1', f'{level}_score_1']].merge(
+        labels_df[[KEY_COLUMN, label_column]], on=KEY_COLUMN, how='inner')
+    sample = sample[sample[label_column].fillna('') != '']
+    result = {'level': level, 'labeled_rows': len(sample), 'threshold': None,
+              'precision': None, 'coverage': None}
+    if len(sample) == 0:
+        return result
+
+    sample = sample.sort_values(f'{level}_score_1', ascending=False, kind='stable')
+    scores = sample[f'{level}_score_1'].astype(float).to_numpy()
+    correct = (sample[f'{level}_match_1'] == sample[label_column]).to_numpy()
+    # Precision when accepting the i+1 highest-scoring rows
+    precision = np.cumsum(correct) / np.arange(1, len(sample) + 1)
+
+    # Only cut between distinct scores, so every row at the cut score is accepted together
+    last_of_score = np.append(scores[1:] != scores[:-1], True)
+    candidates = np.flatnonzero(last_of_score & (precision >= target_precision))
+    if len(candidates) == 0:
+        return result
+    best = candidates[-1]
+    result.update(threshold=round(float(scores[best]), 4), precision=round(float(precision[best]), 4),
+                  coverage=round((best + 1) / len(sample), 4))
+    return result
+
+
+def build_report(result_df: pd.DataFrame, threshold: float, labels_df: Optional[pd.DataFrame] = None,
+                 target_precision: float = 0.9, run_stats: Optional[Dict] = None) -> str:
+    """
+    Build a markdown match-quality and throughput report.
+
+    Args:
+        result_df: Matcher output produced with include_scores=True
+        threshold: Threshold the run applied
+        labels_df: Optional labeled sample for threshold calibration
+        target_precision: Precision target for calibration
+        run_stats: Optional {'rows', 'seconds', 'peak_memory_mb'} for the run
+
+    Returns:
+        The report text
+    """
+    report = f"""# Category Matching Report
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## Run
+- **Rows**: {len(result_df)}
+- **Threshold**: {threshold}
+"""
+    if run_stats:
+        seconds = run_stats['seconds']
+        rows_per_second = run_stats['rows'] / seconds if seconds > 0 else float('nan')
+        report += f"""- **Elapsed**: {seconds:.2f}s
+- **Throughput**: {rows_per_second:,.0f} rows/sec
+- **Peak memory**: {run_stats['peak_memory_mb']:.1f} MB
+"""
+
+    for level in ('main', 'detailed'):
+        matched = result_df[f'{level}_score_1'].astype(float) >= threshold
+        report += f"""
+## Top-1 {level.title()} Score Distribution
+- **Match rate**: {matched.mean():.2%}
+```
+{score_distribution(result_df, level).to_string()}
+```
+"""
+
+    report += f"""
+## Match Rates by Main Category
+```
+{match_rates_by_main_category(result_df, threshold).to_string()}
+```
+"""
+
+    if labels_df is not None:
+        report += f"""
+## Threshold Calibration (target precision {target_precision:.0%})
+"""
+        for level in ('main', 'detailed'):
+            if f'true_{level}_category' not in labels_df.columns:
+                continue
+            calibration = calibrate_threshold(result_df, labels_df, target_precision, level)
+            if calibration['threshold'] is None:
+                report += f"- **{level.title()}**: target not reachable on {calibration['labeled_rows']} labeled rows\n"
+            else:
+                report += (f"- **{level.title()}**: threshold {calibration['threshold']} gives precision "
+                           f"{calibration['precision']:.2%} at coverage {calibration['coverage']:.2%} "
+                           f"({calibration['labeled_rows']} labeled rows)\n")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report match quality for a scored category matching output.")
+    parser.add_argument('results', help="Matcher output written with --scores (.csv or .parquet)")
+    parser.add_argument('--threshold', type=float, default=0.3, help="Threshold the run applied")
+    parser.add_argument('--labels', help="Labeled sample with tt_handles and true_main_category/true_detailed_category")
+    parser.add_argument('--target-precision', type=float, default=0.9)
+    parser.add_argument('--output', default='category_match_report.md')
+    args = parser.parse_args()
+
+    labels_df = read_table(args.labels) if args.labels else None
+    report = build_report(read_table(args.results), args.threshold, labels_df, args.target_precision)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(report)
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()